@@ -1,12 +1,56 @@
-import copy
+import argparse
+import array
+import collections
+import concurrent.futures
+import csv
+import glob
+import gzip
+import math
+import heapq
+import mmap
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import shutil
+import struct
 import sys
+import tempfile
+import threading
 import time
 
+try:
+    # the resource module is only available on unix, the memory budget is not checked without it
+    import resource
+except ImportError:
+    resource = None
+
 # define max execution time constant in minutes
+# it is the default execution time of the budget of the search algorithms, see Budget
 MAX_EXECUTION_TIME = 15.0
 
-# define a global variable to store the rank of the highest card
-highest_rank = 0
+# define the number of loops of a search between two checks of its budget
+BUDGET_CHECK_INTERVAL = 1000
+
+# define the default number of nodes kept in each depth of the beam search
+BEAM_WIDTH = 100
+
+# define the maximum number of game states in the transposition table of the IDA* algorithm
+IDA_STAR_TABLE_SIZE = 1000000
+
+# define the number of game states that the external memory BFS keeps in memory before it sorts them and writes them
+# to disk, and the number of game states it reads from disk at a time, split between the files it merges at the same time
+EXTERNAL_BFS_BUFFER_SIZE = 100000
+
+# define the initial number of slots of the memory mapped closed set, a power of 2
+CLOSED_SET_SIZE = 1 << 20
+
+# define the number of minutes between two checkpoints of a search
+CHECKPOINT_INTERVAL = 1.0
+
+# define the settings of the messages of the search algorithms for each thread, see report
+messages = threading.local()
 
 
 # The input file is in the following format:
@@ -38,11 +82,27 @@ highest_rank = 0
 # The game ends when all the cards are in the foundations in the order 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13.
 
 # defining the class for the card
+# cards are values that never change, so the game states share the cards of the CARDS table (see getCard)
+# and a copy of a card is the card itself
 
 class Card:
+    __slots__ = ("suit", "rank", "code")
+
     def __init__(self, suit, rank):
         self.suit = suit
         self.rank = rank
+        # the small integer that encodes the card, see encodeCard
+        self.code = (rank << 2) | SUIT_INDEX[suit]
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # a card sent to another process is the card of its CARDS table
+    def __reduce__(self):
+        return decodeCard, (self.code,)
 
     def __eq__(self, other):
         # if other is not a card, return false
@@ -50,10 +110,15 @@ class Card:
             return False
         return self.suit == other.suit and self.rank == other.rank
 
+    def __hash__(self):
+        return hash((self.suit, self.rank))
+
 
 # defining the class for the stack
 
 class Stack:
+    __slots__ = ("cards",)
+
     def __init__(self):
         self.cards = []
 
@@ -92,6 +157,8 @@ class Stack:
 # defining the class for the freecell
 
 class FreeCell:
+    __slots__ = ("card",)
+
     def __init__(self):
         self.card = None
 
@@ -130,6 +197,8 @@ class FreeCell:
 # defining the class for the foundation
 
 class Foundation:
+    __slots__ = ("cards",)
+
     def __init__(self):
         self.cards = []
 
@@ -171,311 +240,425 @@ class Foundation:
 # defining the class for the game
 
 class GameState:
+    __slots__ = ("freecell", "stack", "foundation", "hash")
+
     def __init__(self):
         self.freecell = [FreeCell() for _ in range(4)]
         self.stack = [Stack() for _ in range(8)]
         self.foundation = [Foundation() for _ in range(4)]
+        # zobrist hash of the game state, see computeHash
+        self.hash = 0
 
     # function to make a move
+    # the zobrist hash of the game state is updated for the source and the destination of the card
+    # for a supermove, the cards above the moved card keep the card below them, so only the moved card changes the hash
     def makeMove(self, move):
-        if move.sourceType == "stack":
-            self.stack[move.sourceIndex].remove()
-            if move.destinationType == "stack":
-                self.stack[move.destinationIndex].add(move.card)
-            elif move.destinationType == "freecell":
-                self.freecell[move.destinationIndex].add(move.card)
-            elif move.destinationType == "foundation":
-                self.foundation[move.destinationIndex].add(move.card)
-
-        elif move.sourceType == "freecell":
-            self.freecell[move.sourceIndex].remove()
-            if move.destinationType == "stack":
-                self.stack[move.destinationIndex].add(move.card)
-            elif move.destinationType == "freecell":
-                self.freecell[move.destinationIndex].add(move.card)
-            elif move.destinationType == "foundation":
-                self.foundation[move.destinationIndex].add(move.card)
-
-        elif move.sourceType == "foundation":
-            self.foundation[move.sourceIndex].remove()
-            if move.destinationType == "stack":
-                self.stack[move.destinationIndex].add(move.card)
-            elif move.destinationType == "freecell":
-                self.freecell[move.destinationIndex].add(move.card)
-            elif move.destinationType == "foundation":
-                self.foundation[move.destinationIndex].add(move.card)
-
-
-# define aa function that checks if a Node is a win state
-def isGoalState(node):
-    # if at least one foundation is empty, return False
-    for i in range(len(node.gameState.foundation)):
-        # if the foundation does not have as many cards as the highest rank, return False
-        if node.gameState.foundation[i].numberOfCards() != highest_rank or node.gameState.foundation[i].isEmpty():
-            return False
-    # if all foundations are not empty, check if all stacks are empty
-    for i in range(len(node.gameState.stack)):
-        if not node.gameState.stack[i].isEmpty():
-            return False
-    # if all stacks are empty, check if all freecells are empty
-    for i in range(len(node.gameState.freecell)):
-        if not node.gameState.freecell[i].isEmpty():
-            return False
-    # if all freecells are empty, return True
-    return True
+        source = self.getPlace(move.sourceType, move.sourceIndex)
+        destination = self.getPlace(move.destinationType, move.destinationIndex)
+
+        cardsAbove = source.cards[len(source.cards) - move.count + 1:] if move.count > 1 else []
+        for _ in range(move.count):
+            source.remove()
+        self.hash ^= zobristKey(move.sourceType, source, move.card)
+        self.hash ^= zobristKey(move.destinationType, destination, move.card)
+        destination.add(move.card)
+        for card in cardsAbove:
+            destination.add(card)
+
+    # function to get the freecell, stack or foundation of the given type and index
+    def getPlace(self, placeType, index):
+        if placeType == "stack":
+            return self.stack[index]
+        elif placeType == "freecell":
+            return self.freecell[index]
+        else:
+            return self.foundation[index]
+
+    # function to undo a move made by makeMove
+    def unmakeMove(self, move):
+        source = self.getPlace(move.sourceType, move.sourceIndex)
+        destination = self.getPlace(move.destinationType, move.destinationIndex)
+
+        cardsAbove = destination.cards[len(destination.cards) - move.count + 1:] if move.count > 1 else []
+        for _ in range(move.count):
+            destination.remove()
+        self.hash ^= zobristKey(move.destinationType, destination, move.card)
+        self.hash ^= zobristKey(move.sourceType, source, move.card)
+        source.add(move.card)
+        for card in cardsAbove:
+            source.add(card)
+
+    # function to get the rank of the top card of each suit in the foundations, indexed like SUITS
+    def foundationRanks(self):
+        ranks = [0, 0, 0, 0]
+        for foundation in self.foundation:
+            if not foundation.isEmpty():
+                topCard = foundation.top()
+                ranks[SUIT_INDEX[topCard.suit]] = topCard.rank
+        return ranks
+
+    # function to compute the zobrist hash of the game state from scratch
+    def computeHash(self):
+        self.hash = 0
+        for stack in self.stack:
+            below = 0
+            for card in stack.cards:
+                code = encodeCard(card)
+                self.hash ^= ZOBRIST_STACK[code][below]
+                below = code
+        for freecell in self.freecell:
+            if not freecell.isEmpty():
+                self.hash ^= ZOBRIST_FREECELL[encodeCard(freecell.card)]
+        for foundation in self.foundation:
+            for card in foundation.cards:
+                self.hash ^= ZOBRIST_FOUNDATION[encodeCard(card)]
+        return self.hash
+
+
+# The search engines store game states in a compact, immutable encoding instead of GameState objects.
+# Each card is a small integer: the rank in the upper bits and the index of the suit in the lower 2 bits.
+# The value 0 is never a valid card, so it marks an empty free cell.
+# A packed state is a tuple (cascades, foundations, freecells) where:
+# cascades is a sorted tuple of 8 bytes objects, one per stack, the last byte being the top card
+# foundations is a tuple of 4 ranks, the rank of the top card of each suit in the foundations (0 if empty)
+# freecells is a sorted tuple of 4 card codes (0 for an empty free cell)
+# The stacks and the free cells are sorted, so the packed state is canonical: game states that differ only
+# in the order of their stacks or free cells have the same packed state, and other game states differ.
+
+SUITS = ["S", "H", "D", "C"]
+
+SUIT_INDEX = {suit: index for index, suit in enumerate(SUITS)}
+
+
+# Zobrist hashing of game states.
+# A card in a stack is keyed by the card below it (0 for the bottom card), a card in a free cell or in a foundation
+# is keyed only by the card, so the hash does not depend on the order of the stacks or of the free cells.
+# The keys are generated from a fixed seed, so every process computes the same hash for the same game state.
+
+ZOBRIST_SIZE = (13 << 2) + 4
+
+zobristRandom = random.Random(52)
+
+ZOBRIST_STACK = [[zobristRandom.getrandbits(64) for _ in range(ZOBRIST_SIZE)] for _ in range(ZOBRIST_SIZE)]
+
+ZOBRIST_FREECELL = [zobristRandom.getrandbits(64) for _ in range(ZOBRIST_SIZE)]
+
+ZOBRIST_FOUNDATION = [zobristRandom.getrandbits(64) for _ in range(ZOBRIST_SIZE)]
+
+
+# return the zobrist key of a card placed in a place (stack, freecell or foundation)
+# for a stack, the key depends on the top card of the stack without the card
+def zobristKey(placeType, place, card):
+    code = encodeCard(card)
+    if placeType == "stack":
+        below = place.top()
+        return ZOBRIST_STACK[code][0 if below is None else encodeCard(below)]
+    elif placeType == "freecell":
+        return ZOBRIST_FREECELL[code]
+    else:
+        return ZOBRIST_FOUNDATION[code]
+
+
+# compute the zobrist hash of a packed game state
+def hashState(packedState):
+    cascades, foundations, freecells = packedState
+    stateHash = 0
+    for cascade in cascades:
+        below = 0
+        for code in cascade:
+            stateHash ^= ZOBRIST_STACK[code][below]
+            below = code
+    for i in range(4):
+        for rank in range(1, foundations[i] + 1):
+            stateHash ^= ZOBRIST_FOUNDATION[(rank << 2) | i]
+    for code in freecells:
+        if code != 0:
+            stateHash ^= ZOBRIST_FREECELL[code]
+    return stateHash
 
-    # for i in range(len(node.gameState.foundation)):
-    #     if node.gameState.foundation[i].top().rank != 13:
-    #         return False
-    # return True
 
+# define the table of the cards, indexed by the small integer that encodes them
+CARDS = [None] * ((13 << 2) + 4)
+for cardSuit in SUITS:
+    for cardRank in range(1, 14):
+        cardOfTable = Card(cardSuit, cardRank)
+        CARDS[cardOfTable.code] = cardOfTable
 
-# deifine a function to compare two game states and return true if they are equal
-def isEqual(state1, state2):
-    # for each freecell
-    for i in range(4):
-        # if the freecells are both empty
-        if state1.freecell[i].isEmpty() and state2.freecell[i].isEmpty():
-            continue
-        # if the freecells are both not empty
-        elif not state1.freecell[i].isEmpty() and not state2.freecell[i].isEmpty():
-            # if the cards in the freecells are not equal
-            if not state1.freecell[i].top() == state2.freecell[i].top():
-                return False
-        # if the freecells are not both empty
-        else:
-            return False
 
-    # for each stack
-    for i in range(8):
-        # check if the lenght of the stack is equal
-        if not len(state1.stack[i].cards) == len(state2.stack[i].cards):
-            return False
-        # check if the cards in the stack are equal
-        for j in range(len(state1.stack[i].cards)):
-            if not state1.stack[i].cards[j] == state2.stack[i].cards[j]:
-                return False
+# get the card of the CARDS table with the given suit and rank
+def getCard(suit, rank):
+    return CARDS[(rank << 2) | SUIT_INDEX[suit]]
 
-    # for each foundation
-    for i in range(4):
-        # check if the lenght of the foundation is equal
-        if not len(state1.foundation[i].cards) == len(state2.foundation[i].cards):
-            return False
-        # check if the cards in the foundation are equal
-        for j in range(len(state1.foundation[i].cards)):
-            if not state1.foundation[i].cards[j] == state2.foundation[i].cards[j]:
-                return False
 
-    return True
+# encode a card as a small integer
+def encodeCard(card):
+    return card.code
 
 
-# define a function that checks if a game state is approximately equal to another game state
+# decode a small integer to a card of the CARDS table
+def decodeCard(code):
+    return CARDS[code]
 
-def isEqualState2(state1, state2):
-    # find the top cards in the stacks in state 1
-    topCardsInStacksState1 = []
-    for stack in state1.stack:
-        topCardsInStacksState1.append(stack.top())
 
-    # find the top cards in the stacks in state 2
-    topCardsInStacksState2 = []
-    for stack in state2.stack:
-        topCardsInStacksState2.append(stack.top())
+# convert a game state to its compact encoding
+def packState(gameState):
+    # encode the cards of each stack
+    cascades = tuple(sorted(bytes(encodeCard(card) for card in stack.cards) for stack in gameState.stack))
 
-    # for each top stack card in state 1
-    for topCard in topCardsInStacksState1:
-        # if the top stack card is not in state 2
-        if topCard not in topCardsInStacksState2:
-            # return false
-            return False
+    # find the rank of the top card of each suit in the foundations
+    foundations = gameState.foundationRanks()
 
-    # for each top stack card in state 2
-    for topCard in topCardsInStacksState2:
-        # if the top stack card is not in state 1
-        if topCard not in topCardsInStacksState1:
-            # return false
-            return False
+    # encode the cards in the free cells
+    freecells = tuple(sorted(0 if freecell.isEmpty() else encodeCard(freecell.card) for freecell in gameState.freecell))
 
-    # find the top cards in the foundations in state 1
-    topCardsInFoundationsState1 = []
-    for foundation in state1.foundation:
-        topCardsInFoundationsState1.append(foundation.top())
-
-    # find the top cards in the foundations in state 2
-    topCardsInFoundationsState2 = []
-    for foundation in state2.foundation:
-        topCardsInFoundationsState2.append(foundation.top())
-
-    # for each top foundation card in state 1
-    for topCard in topCardsInFoundationsState1:
-        # if the top foundation card is not in state 2
-        if topCard not in topCardsInFoundationsState2:
-            # return false
-            return False
+    return cascades, tuple(foundations), freecells
 
-    # for each top foundation card in state 2
-    for topCard in topCardsInFoundationsState2:
-        # if the top foundation card is not in state 1
-        if topCard not in topCardsInFoundationsState1:
-            # return false
-            return False
 
-    # find the cards in freecells in state 1
-    cardsInFreecellsState1 = []
-    for freecell in state1.freecell:
-        cardsInFreecellsState1.append(freecell.top())
-
-    # find the cards in freecells in state 2
-    cardsInFreecellsState2 = []
-    for freecell in state2.freecell:
-        cardsInFreecellsState2.append(freecell.top())
-
-    # for each card in freecells in state 1
-    for card in cardsInFreecellsState1:
-        # if the card is not in freecells in state 2
-        if card not in cardsInFreecellsState2:
-            # return false
-            return False
+# convert a game state reached by a list of moves from the packed state to its compact encoding
+# the game state must have been unpacked from the packed state before the moves were made,
+# so the stacks that the moves did not touch are shared with the packed state instead of being encoded again
+def packNextState(packedState, gameState, moves):
+    cascades = list(packedState[0])
+    freecellsChanged = False
+    for move in moves:
+        for placeType, index in ((move.sourceType, move.sourceIndex), (move.destinationType, move.destinationIndex)):
+            if placeType == "stack":
+                cascades[index] = None
+            elif placeType == "freecell":
+                freecellsChanged = True
+    for i in range(len(cascades)):
+        if cascades[i] is None:
+            cascades[i] = bytes(encodeCard(card) for card in gameState.stack[i].cards)
 
-    # for each card in freecells in state 2
-    for card in cardsInFreecellsState2:
-        # if the card is not in freecells in state 1
-        if card not in cardsInFreecellsState1:
-            # return false
-            return False
+    # the foundations and the free cells are small, so they are encoded again
+    foundations = tuple(gameState.foundationRanks())
+
+    freecells = packedState[2]
+    if freecellsChanged:
+        freecells = tuple(sorted(0 if freecell.isEmpty() else encodeCard(freecell.card) for freecell in gameState.freecell))
+
+    return tuple(sorted(cascades)), foundations, freecells
 
+
+# convert a compact encoding back to a game state
+def unpackState(packedState):
+    cascades, foundations, freecells = packedState
+    gameState = GameState()
+
+    # populate the stacks
+    for i in range(len(cascades)):
+        for code in cascades[i]:
+            gameState.stack[i].add(decodeCard(code))
+
+    # populate the foundations, the foundation i holds the cards of the suit i
+    for i in range(len(foundations)):
+        for rank in range(1, foundations[i] + 1):
+            gameState.foundation[i].add(CARDS[(rank << 2) | i])
+
+    # populate the free cells
+    for i in range(len(freecells)):
+        if freecells[i] != 0:
+            gameState.freecell[i].add(decodeCard(freecells[i]))
+
+    gameState.computeHash()
+
+    return gameState
+
+
+# print a message of a search algorithm, unless the messages of the thread are turned off (see Solver)
+def report(*values):
+    if getattr(messages, "verbose", True):
+        print(*values)
+
+
+# define a function that checks if a packed game state is a win state
+# the cards of every suit are on the foundations up to the highest rank of the deal, so all the foundations have the
+# same rank and no card is left on the stacks or in the free cells
+def isGoal(packedState):
+    cascades, foundations, freecells = packedState
+    # if at least one foundation does not have as many cards as the others, return False
+    for rank in foundations:
+        if rank != foundations[0] or rank == 0:
+            return False
+    # if all foundations are full, check if all stacks are empty
+    for cascade in cascades:
+        if len(cascade) != 0:
+            return False
+    # if all stacks are empty, check if all freecells are empty
+    for code in freecells:
+        if code != 0:
+            return False
+    # if all freecells are empty, return True
     return True
 
 
-# check if visited states contains the game state
-def isVisited(visitedStates, currentNode):
-    # for each visited node
-    for visitedState in visitedStates:
-        # if the visited node has the same game state
-        if isEqualState2(visitedState, currentNode.gameState):
-            # return true
-            return True
+# defining the class for the key of a game state in the visited states
+# the key holds the canonical packed state and uses the zobrist hash of the game state as its hash,
+# so a set lookup does not hash the packed state, and packed states are only compared when the hashes match
+class StateKey:
+    __slots__ = ("state", "hash")
+
+    def __init__(self, packedState, stateHash):
+        self.state = packedState
+        self.hash = stateHash
+
+    def __hash__(self):
+        return self.hash
 
-    # return false
-    return False
+    def __eq__(self, other):
+        return self.hash == other.hash and self.state == other.state
 
 
 # defining the class of the tree node
+# the node keeps the game state in its compact encoding, see packState, and its zobrist hash
 class Node:
-    def __init__(self, parent, move, gameState):
+    __slots__ = ("parent", "move", "state", "hash", "depth", "pathCost", "cost")
+
+    def __init__(self, parent, move, gameState, stateHash=None):
         self.parent = parent
         self.move = move
-        self.gameState = gameState
+        if isinstance(gameState, GameState):
+            gameState = packState(gameState)
+        self.state = gameState
+        if stateHash is None:
+            stateHash = hashState(gameState)
+        self.hash = stateHash
         self.depth = 0
+        # number of single card moves made from the root node
+        self.pathCost = 0
         self.cost = 0
 
+    # the game state of the node as GameState object
+    @property
+    def gameState(self):
+        return unpackState(self.state)
+
     def __eq__(self, other):
-        return isEqualState2(self.gameState, other.gameState)
+        return self.state == other.state
 
 
 Type = ["stack", "freecell", "foundation"]
 
 
 # define the function to get the next move
-def getValidMoves(gameState):
+# a card is only moved to the first empty freecell, to the first empty stack and to the first foundation it fits,
+# because moving it to another empty place gives the same game state
+# the move that undoes the last move is not returned, and the foundation moves are returned first
+def getValidMoves(gameState, lastMove=None):
     # define the variables
     freecell = gameState.freecell
     stack = gameState.stack
     foundation = gameState.foundation
+    foundationMoves = []
     validMoves = []
 
+    # find the first empty freecell and the first empty stack
+    firstEmptyFreecell = None
+    for j in range(4):
+        if freecell[j].isEmpty():
+            firstEmptyFreecell = j
+            break
+    firstEmptyStack = None
+    for j in range(8):
+        if stack[j].isEmpty():
+            firstEmptyStack = j
+            break
+
     # for each stack check if the top card can make a valid move
     for i in range(8):
         if not stack[i].isEmpty():
-            # for each foundation
+            card = stack[i].top()
+
             # check if the move is a foundation move
             for j in range(4):
-                if foundation[j].isValidMove(stack[i].top()):
-                    move = Move("source " + str(stack[i].top().suit) + str(stack[i].top().rank),
-                                stack[i].top(),
-                                Type[2],
-                                j,
-                                Type[0],
-                                i)
-
-                    validMoves.append(move)
+                if foundation[j].isValidMove(card):
+                    foundationMoves.append(Move(card, Type[2], j, Type[0], i))
+                    break
 
-            # for each freecell
             # check if the move is a free cell move
-            for j in range(4):
-                if freecell[j].isValidMove(stack[i].top()):
-                    move = Move("freecell " + str(stack[i].top().suit) + str(stack[i].top().rank),
-                                stack[i].top(),
-                                Type[1],
-                                j,
-                                Type[0],
-                                i)
-
-                    validMoves.append(move)
+            if firstEmptyFreecell is not None:
+                validMoves.append(Move(card, Type[1], firstEmptyFreecell, Type[0], i))
 
             # for each stack
             # check if the move is a stack move
             for j in range(8):
-                if stack[j].isValidMove(stack[i].top()):
-                    move = Move("stack " + str(stack[i].top().suit) + str(stack[i].top().rank) + " " + str(
-                        stack[j].top().suit) + str(stack[j].top().rank),
-                                stack[i].top(),
-                                Type[0],
-                                j,
-                                Type[0],
-                                i)
-
-                    validMoves.append(move)
-                # check if the move is a new stack move
-                if stack[j].isEmpty():
-                    move = Move("newstack " + str(stack[i].top().suit) + str(stack[i].top().rank),
-                                stack[i].top(),
-                                Type[0],
-                                j,
-                                Type[0],
-                                i)
-
-                    validMoves.append(move)
+                if stack[j].isValidMove(card):
+                    validMoves.append(Move(card, Type[0], j, Type[0], i, stack[j].top()))
+
+            # check if the move is a new stack move
+            # moving the only card of a stack to an empty stack does not change the game state
+            if firstEmptyStack is not None and stack[i].numberOfCards() > 1:
+                validMoves.append(Move(card, Type[0], firstEmptyStack, Type[0], i))
+
+    # find the number of empty freecells and empty stacks that can hold cards during a supermove
+    emptyFreecells = sum(1 for i in range(4) if freecell[i].isEmpty())
+    emptyStacks = sum(1 for i in range(8) if stack[i].isEmpty())
+
+    # for each stack check if a sequence of cards on top of the stack can be moved with a supermove
+    for i in range(8):
+        # find the number of cards on top of the stack that are in sequence
+        sequenceLength = 1
+        cards = stack[i].cards
+        while sequenceLength < len(cards) and cards[-sequenceLength - 1].suit != cards[-sequenceLength].suit \
+                and cards[-sequenceLength - 1].rank == cards[-sequenceLength].rank + 1:
+            sequenceLength += 1
+
+        # for each number of cards of the sequence
+        for count in range(2, sequenceLength + 1):
+            card = cards[-count]
+            # for each stack
+            # check if the move is a stack move
+            if count <= (emptyFreecells + 1) * 2 ** emptyStacks:
+                for j in range(8):
+                    if stack[j].isValidMove(card):
+                        move = Move(card, Type[0], j, Type[0], i, stack[j].top())
+                        move.setSupermove(cards[-count:], stack[j].top(), emptyFreecells, emptyStacks)
+
+                        validMoves.append(move)
+
+            # check if the move is a new stack move, the destination stack cannot hold cards during the move
+            # moving the whole stack to an empty stack does not change the game state
+            if firstEmptyStack is not None and count < len(cards) \
+                    and count <= (emptyFreecells + 1) * 2 ** (emptyStacks - 1):
+                move = Move(card, Type[0], firstEmptyStack, Type[0], i)
+                move.setSupermove(cards[-count:], None, emptyFreecells, emptyStacks - 1)
+
+                validMoves.append(move)
 
     # for each freecell check if the card in the freecell can make a valid move
     for i in range(4):
         if not freecell[i].isEmpty():
-            # for each foundation
+            card = freecell[i].top()
+
             # check if the move is a foundation move
             for j in range(4):
-                if foundation[j].isValidMove(freecell[i].top()):
-                    move = Move("source " + str(freecell[i].top().suit) + str(freecell[i].top().rank),
-                                freecell[i].top(),
-                                Type[2],
-                                j,
-                                Type[1],
-                                i)
-
-                    validMoves.append(move)
+                if foundation[j].isValidMove(card):
+                    foundationMoves.append(Move(card, Type[2], j, Type[1], i))
+                    break
 
             # for each stack
             # check if the move is a stack move
             for j in range(8):
-                if stack[j].isValidMove(freecell[i].top()):
-                    move = Move("stack " + str(freecell[i].top().suit) + str(freecell[i].top().rank) + " " + str(
-                        stack[j].top().suit) + str(stack[j].top().rank),
-                                freecell[i].top(),
-                                Type[0],
-                                j,
-                                Type[1],
-                                i)
-
-                    validMoves.append(move)
-                # check if the move is a new stack move
-                if stack[j].isEmpty():
-                    move = Move("newstack " + str(freecell[i].top().suit) + str(freecell[i].top().rank),
-                                freecell[i].top(),
-                                Type[0],
-                                j,
-                                Type[1],
-                                i)
-
-                    validMoves.append(move)
+                if stack[j].isValidMove(card):
+                    validMoves.append(Move(card, Type[0], j, Type[1], i, stack[j].top()))
+
+            # check if the move is a new stack move
+            if firstEmptyStack is not None:
+                validMoves.append(Move(card, Type[0], firstEmptyStack, Type[1], i))
+
+    # the foundation moves are made first
+    validMoves = foundationMoves + validMoves
+
+    # remember the card below the moved cards of the moves from a stack
+    for move in validMoves:
+        if move.sourceType == Type[0]:
+            cards = stack[move.sourceIndex].cards
+            if len(cards) > move.count:
+                move.belowCard = cards[-move.count - 1]
+
+    # remove the move that undoes the last move
+    if lastMove is not None:
+        validMoves = [move for move in validMoves if not isInverseMove(move, lastMove, gameState)]
 
     # check if moves are at least one
     if len(validMoves) == 0:
@@ -485,713 +668,2060 @@ def getValidMoves(gameState):
     return validMoves
 
 
+# define a function that checks if a move undoes the last move, so it leads back to the previous game state
+# if cards were moved automatically to the foundations after the last move, the move does not undo it
+def isInverseMove(move, lastMove, gameState):
+    if len(lastMove.autoMoves) > 0:
+        return False
+    if not move.card == lastMove.card or move.count != lastMove.count:
+        return False
+    if move.sourceType != lastMove.destinationType or move.destinationType != lastMove.sourceType:
+        return False
+    # a card moved between stacks only goes back if it is moved on the card it was on
+    if move.destinationType == Type[0]:
+        destinationCard = gameState.stack[move.destinationIndex].top()
+        if lastMove.belowCard is None:
+            return destinationCard is None
+        return lastMove.belowCard == destinationCard
+    return True
+
+
+# define the function that gets the line of the output file for a single card move of the card to the destination type
+# destinationCard is the top card of the destination stack, None if the stack is empty or the destination is not a stack
+def getMoveName(card, destinationType, destinationCard):
+    if destinationType == Type[2]:
+        return "source " + str(card.suit) + str(card.rank)
+    if destinationType == Type[1]:
+        return "freecell " + str(card.suit) + str(card.rank)
+    if destinationCard is None:
+        return "newstack " + str(card.suit) + str(card.rank)
+    return "stack " + str(card.suit) + str(card.rank) + " " + str(destinationCard.suit) + str(destinationCard.rank)
+
+
 # defining the class move
+# a move is a compound move if safe foundation moves were played automatically after it, see autoPlay
+# the name of the move is only built when it is needed, see getMoveName
 class Move:
-    def __init__(self, name, card, destinationType, destinationIndex, sourceType, sourceIndex):
-        self.name = name
+    __slots__ = ("card", "destinationType", "destinationIndex", "sourceType", "sourceIndex", "autoMoves", "count",
+                 "supermove", "belowCard", "destinationCard")
+
+    def __init__(self, card, destinationType, destinationIndex, sourceType, sourceIndex, destinationCard=None):
         self.card = card
         self.destinationType = destinationType
         self.destinationIndex = destinationIndex
         self.sourceType = sourceType
         self.sourceIndex = sourceIndex
+        self.autoMoves = []
+        # number of cards moved, more than one for a supermove
+        self.count = 1
+        self.supermove = None
+        # the card below the moved cards before a move from a stack, None if the stack becomes empty
+        self.belowCard = None
+        # the top card of the destination stack before the move, None if the stack is empty or not a stack
+        self.destinationCard = destinationCard
+
+    # the line of the output file for the move
+    @property
+    def name(self):
+        return getMoveName(self.card, self.destinationType, self.destinationCard)
 
     def __eq__(self, other):
         # if the other move is not a move
         if not isinstance(other, Move):
             return False
-        return self.name == other.name
+        return self.card is other.card and self.destinationType == other.destinationType \
+            and self.destinationCard is other.destinationCard
+
+    # make the move a supermove of the given cards, from the bottom to the top, to the destination card
+    # (None for an empty stack), using the given number of empty free cells and empty stacks
+    def setSupermove(self, cards, destinationCard, emptyFreecells, emptyStacks):
+        self.count = len(cards)
+        self.supermove = (list(cards), destinationCard, emptyFreecells, emptyStacks)
+
+    # get the number of single card moves of the move, including the automatic moves
+    def numberOfSteps(self):
+        if self.supermove is not None:
+            cards, destinationCard, emptyFreecells, emptyStacks = self.supermove
+            steps = countSupermoveSteps(len(cards), emptyFreecells, emptyStacks)
+        else:
+            steps = 1
+        return steps + len(self.autoMoves)
+
+    # get the lines of the output file for the move, one line for the move and one for each automatic move
+    # a supermove is expanded to the single card moves that make it
+    def getNames(self):
+        if self.supermove is not None:
+            names = expandSupermove(*self.supermove)
+        else:
+            names = [self.name]
+        return names + [autoMove.name for autoMove in self.autoMoves]
+
+
+# define the function that counts the single card moves of a supermove of count cards, see expandSupermove
+def countSupermoveSteps(count, emptyFreecells, emptyStacks):
+    if count <= emptyFreecells + 1:
+        return 2 * count - 1
+    upperCount = min(count - 1, (emptyFreecells + 1) * 2 ** (emptyStacks - 1))
+    return 2 * countSupermoveSteps(upperCount, emptyFreecells, emptyStacks - 1) \
+        + countSupermoveSteps(count - upperCount, emptyFreecells, emptyStacks - 1)
+
+
+# define the function that expands a supermove to single card moves
+# cards are the moved cards from the bottom to the top, destinationCard is the card they are moved on
+# (None for an empty stack), emptyFreecells and emptyStacks are the free cells and stacks that can hold cards
+# return the names of the single card moves
+def expandSupermove(cards, destinationCard, emptyFreecells, emptyStacks):
+    names = []
+
+    # if the cards fit in the free cells, move the upper cards to the free cells,
+    # the bottom card to the destination and the upper cards back on it
+    if len(cards) <= emptyFreecells + 1:
+        for card in reversed(cards[1:]):
+            names.append(getMoveName(card, Type[1], None))
+        names.append(getMoveName(cards[0], Type[0], destinationCard))
+        for k in range(1, len(cards)):
+            names.append(getMoveName(cards[k], Type[0], cards[k - 1]))
+        return names
+
+    # else move the upper cards to an empty stack, the lower cards to the destination and the upper cards on them
+    upperCount = min(len(cards) - 1, (emptyFreecells + 1) * 2 ** (emptyStacks - 1))
+    lowerCards = cards[:len(cards) - upperCount]
+    upperCards = cards[len(cards) - upperCount:]
+    names.extend(expandSupermove(upperCards, None, emptyFreecells, emptyStacks - 1))
+    names.extend(expandSupermove(lowerCards, destinationCard, emptyFreecells, emptyStacks - 1))
+    names.extend(expandSupermove(upperCards, lowerCards[-1], emptyFreecells, emptyStacks - 1))
+    return names
+
+
+# define the function that encodes a move as a small integer, used by the node store
+# the move is encoded by its card, the type of its destination, the top card of the destination stack (0 if the
+# destination is not a stack or is empty) and its number of cards, so it can be decoded on any layout of the game state
+def encodeMove(move):
+    destinationCode = 0 if move.destinationCard is None else encodeCard(move.destinationCard)
+    return encodeCard(move.card) | (Type.index(move.destinationType) << 6) | (destinationCode << 8) | (move.count << 14)
+
+
+# define the function that decodes a move encoded by encodeMove for the given game state
+def decodeMove(moveCode, gameState):
+    card = decodeCard(moveCode & 63)
+    destinationType = Type[(moveCode >> 6) & 3]
+    destinationCode = (moveCode >> 8) & 63
+    count = moveCode >> 14
+
+    # find the stack or the freecell that holds the card
+    for i in range(8):
+        cards = gameState.stack[i].cards
+        if len(cards) >= count and cards[-count] == card:
+            sourceType, sourceIndex = Type[0], i
+            break
+    else:
+        for i in range(4):
+            if gameState.freecell[i].card == card:
+                sourceType, sourceIndex = Type[1], i
+                break
+
+    # find the destination of the card
+    destinationCard = None
+    if destinationType == Type[0]:
+        for j in range(8):
+            if (destinationCode == 0 and gameState.stack[j].isEmpty()) or \
+                    (destinationCode != 0 and not gameState.stack[j].isEmpty()
+                     and encodeCard(gameState.stack[j].top()) == destinationCode):
+                destinationIndex = j
+                destinationCard = gameState.stack[j].top()
+                break
+    elif destinationType == Type[1]:
+        for j in range(4):
+            if gameState.freecell[j].isEmpty():
+                destinationIndex = j
+                break
+    else:
+        for j in range(4):
+            if gameState.foundation[j].isValidMove(card):
+                destinationIndex = j
+                break
+
+    move = Move(card, destinationType, destinationIndex, sourceType, sourceIndex, destinationCard)
+    if sourceType == Type[0]:
+        cards = gameState.stack[sourceIndex].cards
+        if len(cards) > count:
+            move.belowCard = cards[-count - 1]
+
+    # a supermove uses the empty freecells and the empty stacks other than its destination
+    if count > 1:
+        cards = gameState.stack[sourceIndex].cards
+        emptyFreecells = sum(1 for i in range(4) if gameState.freecell[i].isEmpty())
+        emptyStacks = sum(1 for i in range(8) if gameState.stack[i].isEmpty())
+        if destinationCard is None:
+            emptyStacks -= 1
+        move.setSupermove(cards[-count:], destinationCard, emptyFreecells, emptyStacks)
+
+    return move
+
+
+# define a function that checks if a card can be moved to the foundations without losing a solution
+# a card can be placed on a card of a different suit and one rank higher, so the card is safe
+# if all the cards of the other suits that are one rank lower are already in the foundations
+def isSafeAutoMove(card, foundationRanks):
+    if card.rank <= 2:
+        return True
+    suitIndex = SUIT_INDEX[card.suit]
+    for i in range(4):
+        if i != suitIndex and foundationRanks[i] < card.rank - 1:
+            return False
+    return True
 
 
-# define the function used to get the next state
-def getNextState(currentGameState, move):
-    # create a copy of the current game state
-    nextGameState = copy.deepcopy(currentGameState)
+# define the function that finds a top card of a stack or a card in a freecell that can be safely moved to a foundation
+def getSafeAutoMove(gameState):
+    foundationRanks = gameState.foundationRanks()
 
-    # make the move in the next game state
-    nextGameState.makeMove(move)
+    # the places holding a card that can be moved
+    places = [(Type[0], i, gameState.stack[i]) for i in range(8)] + [(Type[1], i, gameState.freecell[i]) for i in range(4)]
+
+    for placeType, i, place in places:
+        card = place.top()
+        if card is not None and foundationRanks[SUIT_INDEX[card.suit]] == card.rank - 1 and isSafeAutoMove(card, foundationRanks):
+            for j in range(4):
+                if gameState.foundation[j].isValidMove(card):
+                    return Move(card, Type[2], j, placeType, i)
+    return None
+
+
+# define the function that plays all the safe foundation moves on the game state
+# return the list of moves that were made
+def autoPlay(gameState):
+    autoMoves = []
+    autoMove = getSafeAutoMove(gameState)
+    while autoMove is not None:
+        gameState.makeMove(autoMove)
+        autoMoves.append(autoMove)
+        autoMove = getSafeAutoMove(gameState)
+    return autoMoves
+
+
+# define the function used to get the next state
+# the move is made on the current game state and undone after the next state is packed,
+# so the current game state is not copied, currentState is the packed state the current game state was unpacked from
+# (see packNextState, the stacks of packState are sorted so they can not be packed again from the game state)
+# after the move, the safe foundation moves are played automatically and stored in the autoMoves of the move
+# return the packed next state and its zobrist hash
+def getNextState(currentGameState, move, currentState):
+    # make the move and the automatic moves, pack the next game state and undo the moves
+    currentGameState.makeMove(move)
+    move.autoMoves = autoPlay(currentGameState)
+    nextState = packNextState(currentState, currentGameState, [move] + move.autoMoves)
+    nextHash = currentGameState.hash
+    for autoMove in reversed(move.autoMoves):
+        currentGameState.unmakeMove(autoMove)
+    currentGameState.unmakeMove(move)
 
     # compare the next game state with the current game state
-    if not isEqualState2(nextGameState, currentGameState):
+    if not nextState == currentState:
         # return the next game state
-        return nextGameState
+        return nextState, nextHash
     else:
         return None
 
 
-# define the function used to find new nodes
-def findNewNodes(node):
+# define the function used to find the children of a packed game state
+# lastMove is the move that reached the game state, the move that undoes it is not made
+# return a list of (move, packed game state, zobrist hash) of the children, without duplicate game states
+def findChildren(state, lastMove):
+    # unpack the game state
+    gameState = unpackState(state)
+
     # get the valid moves
-    validMoves = getValidMoves(node.gameState)
+    validMoves = getValidMoves(gameState, lastMove)
 
-    # define the children nodes
-    childrenNodes = []
+    # define the children
+    children = []
+    childrenKeys = set()
 
     # if there are no valid moves
     if validMoves is None:
-        return None
+        return children
 
     # for each valid move
     for move in validMoves:
         # find the next state
-        nextState = getNextState(node.gameState, move)
+        nextState = getNextState(gameState, move, state)
 
         if nextState is not None:
+            # if the child is not same with other children
+            childKey = StateKey(nextState[0], nextState[1])
+            if childKey not in childrenKeys:
+                childrenKeys.add(childKey)
+                children.append((move, nextState[0], nextState[1]))
 
-            # create a new child node
-            childNode = Node(node, move, nextState)
-            childNode.depth = node.depth + 1
-
-            # if the child node is not same with other child nodes
-            if not sameChild(childNode, childrenNodes):
-                # add the child node to the children nodes
-                childrenNodes.append(childNode)
+    # return the children
+    return children
 
-    # return the children nodes
-    return childrenNodes
 
+# The heuristics estimate the number of moves needed to reach the goal from a packed game state.
+# They are selected by name from the HEURISTICS dictionary (--heuristic on the command line).
+# The number of moves is counted in single card moves, like the lines of the output file.
 
-# define a function used to check if a child is the same as other children of a node
-def sameChild(child, childrenNodes):
-    # for each visited node
-    for otherChild in childrenNodes:
-        # if the visited node has the same game state
-        if isEqualState2(otherChild.gameState, child.gameState) or otherChild.move == child.move:
-            return True
-    # return false
-    return False
-
-
-# define the Breadth First Search function that is used to find the solution
-def BFS(rootNode):
-    # define visited states
-    visitedStates = []
-
-    # define the queue
-    queue = []
+# define the original heuristic of the solver, it is not admissible
+def heuristicCost(state):
+    cascades, foundations, freecells = state
 
-    # define garbage nodes
-    garbageNodes = []
+    # find how many cards are in the foundations
+    cardsInFoundations = sum(foundations)
 
-    # define moves already made
-    movesMade = []
+    # find how many cards are in the freecells
+    cardsInFreecells = 0
+    for code in freecells:
+        if code != 0:
+            cardsInFreecells += 1
 
-    # add the root state to the queue
-    queue.append(rootNode)
+    # find how many stacks are not empty
+    nonEmptyStacks = 0
+    for cascade in cascades:
+        if len(cascade) != 0:
+            nonEmptyStacks += 1
 
-    # add the root state to the visited states
-    visitedStates.append(rootNode.gameState)
+    # find how many cards are in the stacks
+    cardsInStacks = 0
+    for cascade in cascades:
+        cardsInStacks += len(cascade)
 
-    # define flag for the loop
-    solutionFound = False
+    # calculate the cost
+    cost = cardsInStacks + cardsInFreecells - cardsInFoundations - nonEmptyStacks
 
-    currentNodeNumber = 0
+    # return the cost
+    return cost
 
-    # set an execution time meter
-    startTime = time.time()
 
-    maxExecutionTime = MAX_EXECUTION_TIME
+# define the heuristic that counts the cards that are not in the foundations
+# every card needs at least one move to a foundation, so the heuristic is admissible
+def heuristicCardsNotHome(state):
+    cascades, foundations, freecells = state
+    cardsNotHome = 0
+    for cascade in cascades:
+        cardsNotHome += len(cascade)
+    for code in freecells:
+        if code != 0:
+            cardsNotHome += 1
+    return cardsNotHome
+
+
+# define the heuristic that counts the cards above the next card of each suit that can go to a foundation
+# every such card must be moved before the next card goes to its foundation
+def heuristicBlocking(state):
+    cascades, foundations, freecells = state
+    blockingCards = 0
+    for i in range(4):
+        nextCard = ((foundations[i] + 1) << 2) | i
+        for cascade in cascades:
+            position = cascade.find(nextCard)
+            if position >= 0:
+                blockingCards += len(cascade) - position - 1
+                break
+    return blockingCards
+
+
+# define the heuristic that gives a lower bound of the number of moves
+# a card above a lower card of the same suit in a stack must leave the stack before the lower card goes to the
+# foundation, and cannot go to the foundation before it, so it needs at least two moves, the other cards at least one
+# the heuristic is admissible
+def heuristicMinMoves(state):
+    cascades, foundations, freecells = state
+    moves = heuristicCardsNotHome(state)
+    for cascade in cascades:
+        # the lowest rank of each suit found below the current card
+        lowestRanks = [14, 14, 14, 14]
+        for code in cascade:
+            rank = code >> 2
+            suit = code & 3
+            if lowestRanks[suit] < rank:
+                moves += 1
+            else:
+                lowestRanks[suit] = rank
+    return moves
 
-    numbrerOfLoops = 0
-    # while the queue is not empty or the goal state is not found
-    while len(queue) > 0 and (not solutionFound):
 
-        numbrerOfLoops += 1
-        # get the first node in the queue
-        if len(queue) > 0:
-            currentNode = queue.pop(0)
-            currentNodeNumber += 1
-            currentNodeDepth = currentNode.depth
-            movesMade.append(currentNode.move)
-        else:
-            return movesMade
+# define a weighted combination of the heuristics, it is more informative but not admissible
+def heuristicWeighted(state):
+    cascades, foundations, freecells = state
+    occupiedFreecells = 0
+    for code in freecells:
+        if code != 0:
+            occupiedFreecells += 1
+    return heuristicMinMoves(state) + 2 * heuristicBlocking(state) + occupiedFreecells
 
-        endTime = time.time()
-        executionTime = endTime - startTime
 
-        # print current execution time
+HEURISTICS = {
+    "cost": heuristicCost,
+    "home": heuristicCardsNotHome,
+    "blocking": heuristicBlocking,
+    "minmoves": heuristicMinMoves,
+    "weighted": heuristicWeighted,
+}
 
-        # print("Current execution time: " + str(round(executionTime / 60, 1)) + " minutes. "
-        #	   + "Current depth: " + str(currentNode.depth)
-        #      + ". Queue length: " + str(len(queue))
-        #      + ". Number of visited states: " + str(len(visitedStates))
-        #      + ". Number of moves made: " + str(len(movesMade)), end="\n")
 
-        # if the execution time is greater than the maximum execution time
-        if round(executionTime / 60, 1) > maxExecutionTime:
-            print("Execution time exceeded  : " + str(maxExecutionTime) + " minutes\n")
-            print("No solution found !!!\n")
+# defining the class for the priority queue used by the best first search and the A* algorithm
+# the queue is a binary heap, items with equal priority are popped in the order they were pushed
+class PriorityQueue:
+    def __init__(self):
+        self.heap = []
+        # entries of the items pushed with a key, used to remove or update them
+        self.entries = {}
+        # counter used to break ties in the order of insertion
+        self.counter = 0
+        # number of entries in the heap that have not been removed
+        self.size = 0
+
+    # push an item with the given priority
+    # if an item with the same key is already in the queue, it is replaced (decrease key)
+    def push(self, item, priority, key=None):
+        if key is not None:
+            self.remove(key)
+        entry = [priority, self.counter, item, key]
+        self.counter += 1
+        if key is not None:
+            self.entries[key] = entry
+        heapq.heappush(self.heap, entry)
+        self.size += 1
+
+    # push the children of a node, a list of (item, priority)
+    def extend(self, children):
+        for item, priority in children:
+            self.push(item, priority)
+
+    # remove the item with the given key, its heap entry is only marked as removed (lazy deletion)
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            entry[2] = None
+            self.size -= 1
+
+    # return the priority of the item with the given key, or None if it is not in the queue
+    def priority(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry[0]
 
-            # return the visited nodes
-            return movesMade
+    # pop the item with the lowest priority
+    def pop(self):
+        while self.heap:
+            priority, count, item, key = heapq.heappop(self.heap)
+            if item is not None:
+                if key is not None:
+                    del self.entries[key]
+                self.size -= 1
+                return item
+        raise IndexError("pop from an empty priority queue")
 
-        # if the current node has the goal state
-        if isGoalState(currentNode):
-            # set the flag to true
-            solutionFound = True
-            # print("Goal state found")
-            print("Goal state found at depth", currentNode.depth)
-            # find the execution time
-            endTime = time.time()
-            executionTime = endTime - startTime
+    def __len__(self):
+        return self.size
 
-            # convert the execution time to seconds
 
-            # print execution time in seconds
-            print("Execution time: " + str(round(executionTime / 60, 1)) + " minutes")
-            print(str(numbrerOfLoops) + " loops were made\n")
-            # return the moves made
-            return movesMade
+# defining the class for the frontier of the breadth first search, the nodes are expanded in the order they were added
+class QueueFrontier:
+    def __init__(self):
+        # a deque pops from the front in constant time
+        self.queue = collections.deque()
 
-        else:
-            # find the children nodes
-            childrenNodes = findNewNodes(currentNode)
-
-            # if children nodes are not none
-            if childrenNodes is not None:
-                # for each child node
-                for childNode in childrenNodes:
-                    # if the child node is not visited
-                    if not isVisited(visitedStates, childNode):
-                        # add the child node to the queue
-                        queue.append(childNode)
-
-                        lastNodeDepth = childNode.depth
-
-                        # add the child state to the visited states
-                        visitedStates.append(childNode.gameState)
-
-    # find the execution time
-    endTime = time.time()
-    executionTime = endTime - startTime
-
-    # convert the execution time to seconds
-    executionTime = executionTime * 1000
-    # print execution time in seconds
-    print("Execution time: " + str(executionTime) + " seconds\n")
-    print("No solution found !!!\n")
-
-    # return the visited nodes
-    return movesMade
+    # add the children of a node, a list of (node id, cost)
+    def extend(self, children):
+        for nodeId, cost in children:
+            self.queue.append(nodeId)
 
+    def pop(self):
+        return self.queue.popleft()
 
-# implement the Depth First Search function that is used to find the solution using the DFS algorithm.
-def DFS(rootNode):
-    # define visited states
-    visitedStates = []
+    def __len__(self):
+        return len(self.queue)
 
-    # define stack
-    queue = []
 
-    # define moves already made
-    movesMade = []
+# defining the class for the frontier of the depth first search, the top of the stack is the end of the list
+class StackFrontier:
+    def __init__(self):
+        self.stack = []
 
-    # add the root node to the queue
-    queue.append(rootNode)
+    # add the children of a node in reverse order, so the first child is on top of the stack
+    def extend(self, children):
+        for nodeId, cost in reversed(children):
+            self.stack.append(nodeId)
 
-    # add the root state to the visited states
-    visitedStates.append(rootNode.gameState)
+    def pop(self):
+        return self.stack.pop()
 
-    # define flag for the loop
-    solutionFound = False
+    def __len__(self):
+        return len(self.stack)
 
-    # set an execution time meter
-    startTime = time.time()
 
-    maxExecutionTime = MAX_EXECUTION_TIME
+# defining the class for the node store of the search algorithms
+# The nodes are kept in parallel arrays indexed by node id instead of Node objects: the id of the parent node (-1 for
+# the root node), the code of the move that reached the node (see encodeMove), the depth, the number of single card
+# moves from the root node and the cost. The path of a node is found by following the parent ids.
+class NodeStore:
+    def __init__(self):
+        self.parents = array.array('i')
+        self.moves = array.array('I')
+        self.depths = array.array('I')
+        self.pathCosts = array.array('I')
+        self.costs = array.array('f')
+
+    # add a node and return its id
+    def add(self, parent, moveCode, depth, pathCost, cost):
+        self.parents.append(parent)
+        self.moves.append(moveCode)
+        self.depths.append(depth)
+        self.pathCosts.append(pathCost)
+        self.costs.append(cost)
+        return len(self.parents) - 1
+
+    def __len__(self):
+        return len(self.parents)
+
+    # find the moves of the path from the root node to a node
+    # the moves are decoded by replaying them from the packed game state of the root node
+    def getPath(self, nodeId, rootState):
+        moveCodes = []
+        while self.parents[nodeId] != -1:
+            moveCodes.append(self.moves[nodeId])
+            nodeId = self.parents[nodeId]
+        moveCodes.reverse()
+        return replayMoves(rootState, moveCodes)
+
+
+# define the function that decodes the moves of a path from the packed game state of its root node
+# each move is made with its automatic moves, so the next move is decoded on the game state it is made on
+def replayMoves(rootState, moveCodes):
+    gameState = unpackState(rootState)
+    path = []
+    for moveCode in moveCodes:
+        move = decodeMove(moveCode, gameState)
+        gameState.makeMove(move)
+        move.autoMoves = autoPlay(gameState)
+        path.append(move)
+    return path
+
+
+# defining the class for the closed set kept in a memory mapped file
+# The file is an open addressing hash table of the 8 byte zobrist hashes of the game states (0 is an empty slot, a hash
+# of 0 is stored as 1), after a header with the size of the table and the number of game states. The operating system
+# keeps in memory only the pages of the table that are used, and the file can be opened again by a later run.
+# Two game states with the same zobrist hash are taken as the same game state.
+# The set has the add and in operations of the set of StateKey objects used by the search algorithms.
+class MmapClosedSet:
+    # the header is the file type, the number of slots and the number of game states
+    HEADER = struct.Struct("<8sQQ")
+    FILE_TYPE = b"FCCLOSED"
+
+    # open the closed set of the file, a new closed set is created if the file does not exist or clear is True
+    def __init__(self, fileName, clear=False):
+        self.fileName = fileName
+        if clear or not os.path.exists(fileName) or os.path.getsize(fileName) == 0:
+            self.create(fileName, CLOSED_SET_SIZE)
+        self.open()
+
+    # create an empty closed set file with the given number of slots
+    @classmethod
+    def create(cls, fileName, size):
+        with open(fileName, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.FILE_TYPE, size, 0))
+            f.truncate(cls.HEADER.size + 8 * size)
+
+    # map the file in memory
+    def open(self):
+        self.file = open(self.fileName, 'r+b')
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        fileType, self.size, self.count = self.HEADER.unpack_from(self.mmap, 0)
+        if fileType != self.FILE_TYPE:
+            raise ValueError("not a closed set file: " + self.fileName)
+        self.mask = self.size - 1
+        self.slots = memoryview(self.mmap)[self.HEADER.size:].cast('Q')
+
+    # write the changes to the file and unmap it
+    def close(self):
+        self.HEADER.pack_into(self.mmap, 0, self.FILE_TYPE, self.size, self.count)
+        self.slots.release()
+        self.mmap.flush()
+        self.mmap.close()
+        self.file.close()
+
+    # write the closed set to a copy of its file
+    def copy(self, fileName):
+        self.HEADER.pack_into(self.mmap, 0, self.FILE_TYPE, self.size, self.count)
+        self.mmap.flush()
+        shutil.copyfile(self.fileName, fileName)
+
+    # replace the closed set by the one of a copy of its file
+    def restore(self, fileName):
+        self.close()
+        shutil.copyfile(fileName, self.fileName)
+        self.open()
+
+    # double the number of slots, the hashes are added to a new file that replaces the file
+    def resize(self):
+        newFileName = self.fileName + ".resize"
+        self.create(newFileName, 2 * self.size)
+        newSet = MmapClosedSet(newFileName)
+        for fingerprint in self.slots:
+            if fingerprint != 0:
+                newSet.addFingerprint(fingerprint)
+        newSet.close()
+        self.close()
+        os.replace(newFileName, self.fileName)
+        self.open()
+
+    # add a hash to the table, return False if it was already in the table
+    def addFingerprint(self, fingerprint):
+        slots = self.slots
+        mask = self.mask
+        i = fingerprint & mask
+        while slots[i] != 0:
+            if slots[i] == fingerprint:
+                return False
+            i = (i + 1) & mask
+        slots[i] = fingerprint
+        self.count += 1
+        return True
+
+    # add the key of a game state
+    def add(self, key):
+        if self.addFingerprint(key.hash or 1):
+            # keep at least half of the slots empty
+            if 2 * self.count > self.size:
+                self.resize()
+            else:
+                self.HEADER.pack_into(self.mmap, 0, self.FILE_TYPE, self.size, self.count)
+
+    def __contains__(self, key):
+        fingerprint = key.hash or 1
+        slots = self.slots
+        mask = self.mask
+        i = fingerprint & mask
+        while slots[i] != 0:
+            if slots[i] == fingerprint:
+                return True
+            i = (i + 1) & mask
+        return False
+
+    def __len__(self):
+        return self.count
+
+
+# defining the class for the budget of a search
+# The budget limits the execution time in minutes, the number of loops (expanded nodes) and the peak memory of the
+# process in megabytes, None for no limit. The search calls isExhausted once per loop, which checks the number of loops
+# every time and reads the clock and the memory every BUDGET_CHECK_INTERVAL loops. When the budget is exhausted, the
+# search returns the moves of the path to the best node it expanded (the one with the most cards on the foundations)
+# instead of a solution, see getProgress.
+class Budget:
+    def __init__(self, maxExecutionTime=MAX_EXECUTION_TIME, maxLoops=None, maxMemory=None):
+        self.maxExecutionTime = maxExecutionTime
+        self.maxLoops = maxLoops
+        self.maxMemory = maxMemory
+        self.start()
+
+    # start counting the execution time and the loops of a search
+    def start(self):
+        self.startTime = time.time()
+        self.numberOfLoops = 0
+        # the limit that was exceeded, None if the budget is not exhausted
+        self.exhausted = None
+
+    # get the execution time in minutes
+    def executionTime(self):
+        return (time.time() - self.startTime) / 60
+
+    # count a loop of the search and return True if the budget is exhausted
+    # a search makes at most maxLoops loops, the loop that finds the budget exhausted is not counted
+    def isExhausted(self):
+        if self.exhausted is None:
+            if self.maxLoops is not None and self.numberOfLoops >= self.maxLoops:
+                self.exhausted = "Number of loops exceeded  : " + str(self.maxLoops) + " loops"
+            else:
+                self.numberOfLoops += 1
+                if self.numberOfLoops % BUDGET_CHECK_INTERVAL == 0:
+                    self.check()
+        return self.exhausted is not None
+
+    # check the limits of the budget and return True if the budget is exhausted
+    def check(self):
+        if self.maxExecutionTime is not None and self.executionTime() > self.maxExecutionTime:
+            self.exhausted = "Execution time exceeded  : " + str(self.maxExecutionTime) + " minutes"
+        elif self.maxLoops is not None and self.numberOfLoops > self.maxLoops:
+            self.exhausted = "Number of loops exceeded  : " + str(self.maxLoops) + " loops"
+        elif self.maxMemory is not None and resource is not None:
+            # the peak memory is in kilobytes, in bytes on macOS
+            peakMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            if sys.platform == "darwin":
+                peakMemory /= 1024
+            if peakMemory > self.maxMemory:
+                self.exhausted = "Memory exceeded  : " + str(self.maxMemory) + " megabytes"
+        return self.exhausted is not None
+
+
+# define the function that measures how close a packed game state is to the goal, the number of cards on the foundations
+# the search algorithms return the path to the node with the greatest progress when their budget is exhausted
+def getProgress(state):
+    return sum(state[1])
+
+
+# define the function that counts the cards moved to the foundations by the moves of a path
+def countFoundationMoves(movesMade):
+    return sum(1 for move in movesMade for step in [move] + move.autoMoves if step.destinationType == Type[2])
+
+
+# print the message of an exhausted budget and return the moves of the partial path, None if there is no partial path
+def returnPartialPath(budget, movesMade):
+    report(budget.exhausted + "\n")
+    if movesMade is None:
+        report("No solution found !!!\n")
+        return None
+    report("Partial path found with " + str(countFoundationMoves(movesMade)) + " cards moved to the foundations\n")
+    return movesMade
 
-    numbrerOfLoops = 0
 
-    # while the stack is greater than 0 and the solution is not found
-    while len(queue) > 0 and not solutionFound:
+# A checkpoint of a search is a compressed file of two pickles. The first one is the header, a dictionary with the
+# packed game state of the root node, the settings of the search (see checkpointSettings) and whether the search uses a
+# memory mapped closed set, so a checkpoint can be checked without reading the search. The second one is a dictionary
+# with the node store, the nodes that have not been expanded, the frontier, the visited states, the shortest paths of A*,
+# the number of loops and the expanded node with the greatest progress.
+# A memory mapped closed set is not pickled, its file is copied to the checkpoint file name followed by .closed.
+# The files are written to temporary files that replace the previous checkpoint, so a killed search always leaves a
+# complete checkpoint. The closed set is replaced last, a checkpoint with an older closed set only searches again
+# some game states.
+
+# define the settings of a search that must not change when it is resumed: the algorithm, the name of the heuristic
+# (see HEURISTICS) and the weight, None for the settings the algorithm does not use
+def checkpointSettings(algorithm, heuristic=None, weight=None):
+    if heuristic is not None:
+        heuristic = next((name for name in HEURISTICS if HEURISTICS[name] is heuristic), heuristic.__name__)
+    return algorithm, heuristic, weight
+
+
+# write a checkpoint of a search
+def writeCheckpoint(fileName, header, checkpoint):
+    visitedStates = checkpoint["visitedStates"]
+    if isinstance(visitedStates, MmapClosedSet):
+        visitedStates.copy(fileName + ".closed.tmp")
+        checkpoint = dict(checkpoint, visitedStates=None)
+    header = dict(header, closedSet=isinstance(visitedStates, MmapClosedSet))
+
+    with gzip.open(fileName + ".tmp", 'wb', compresslevel=1) as f:
+        pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(checkpoint, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(fileName + ".tmp", fileName)
+
+    if isinstance(visitedStates, MmapClosedSet):
+        os.replace(fileName + ".closed.tmp", fileName + ".closed")
+
+
+# read the header of a checkpoint file
+def readCheckpointHeader(fileName):
+    with gzip.open(fileName, 'rb') as f:
+        return pickle.load(f)
+
+
+# check that the checkpoint of a header can be resumed by a search of the root node with the given settings and closed
+# set (None if the visited states are kept in memory)
+# return the message of the first mismatch, None if the checkpoint can be resumed
+def checkCheckpoint(fileName, header, rootNode, settings, closedSet=None):
+    if header["rootState"] != rootNode.state:
+        return "the checkpoint " + fileName + " is the search of another deal"
+    if header["settings"] != settings:
+        algorithm, heuristic, weight = header["settings"]
+        return "the checkpoint " + fileName + " is a search of " + algorithm \
+            + ("" if heuristic is None else " with the heuristic " + heuristic) \
+            + ("" if weight is None else " and the weight " + str(weight))
+    if header["closedSet"] and closedSet is None:
+        return "the checkpoint " + fileName + " needs the closed set file of the search"
+    return None
+
+
+# read the checkpoint of a search of the root node with the given settings
+# the closed set is restored from its copy, it must be given if the search used a memory mapped closed set
+def readCheckpoint(fileName, rootNode, settings, closedSet=None):
+    with gzip.open(fileName, 'rb') as f:
+        header = pickle.load(f)
+        message = checkCheckpoint(fileName, header, rootNode, settings, closedSet)
+        if message is not None:
+            raise ValueError(message)
+        checkpoint = pickle.load(f)
+
+    if header["closedSet"]:
+        closedSet.restore(fileName + ".closed")
+        checkpoint["visitedStates"] = closedSet
+    return checkpoint
+
+
+# The search algorithms return the moves of the path from the root node to the goal node, or None if no solution was
+# found. If a trace list is given, the move of every expanded node is added to it (the exploration trace).
+
+# implement the graph search used by the BFS, DFS, best first search and A* algorithms
+# the frontier decides the order in which the nodes are expanded, costFunction gives the cost of a node from its number
+# of single card moves and its packed game state (None if the frontier does not use costs)
+# only the nodes that have not been expanded keep their packed game state, the other nodes are in the node store
+# closedSet is the set of the visited states (a MmapClosedSet), None to keep them in memory
+# if a checkpoint file name is given, the search is written to it every CHECKPOINT_INTERVAL minutes and when the
+# budget is exhausted, and if resume is True the search continues from the checkpoint file
+# settings are the settings of the search kept in the checkpoint, see checkpointSettings
+# if reopen is True (A*), the frontier must be a PriorityQueue: the number of single card moves of the shortest path
+# found to each game state is kept by zobrist hash, and a game state reached again by a shorter path is pushed again
+# with the lower cost (decrease key), or expanded again if it was already expanded
+def graphSearch(rootNode, frontier, costFunction=None, trace=None, budget=None, closedSet=None, checkpoint=None,
+                resume=False, settings=None, reopen=False):
+    if resume:
+        # read the search from the checkpoint file
+        savedSearch = readCheckpoint(checkpoint, rootNode, settings, closedSet)
+        store = savedSearch["store"]
+        openNodes = savedSearch["openNodes"]
+        frontier = savedSearch["frontier"]
+        visitedStates = savedSearch["visitedStates"]
+        pathCosts = savedSearch["pathCosts"]
+        numbrerOfLoops = savedSearch["numberOfLoops"]
+        bestId = savedSearch["bestId"]
+        bestProgress = savedSearch["bestProgress"]
+        report("Search resumed from " + checkpoint + " after " + str(numbrerOfLoops) + " loops\n")
+    else:
+        # create the node store
+        store = NodeStore()
+
+        # create a set to store the keys of the visited states
+        visitedStates = set() if closedSet is None else closedSet
+
+        # define the packed game state, the zobrist hash and the move of the nodes that have not been expanded,
+        # by node id
+        openNodes = {}
+
+        # add the root node to the frontier and to the visited states
+        rootId = store.add(-1, 0, rootNode.depth, rootNode.pathCost, rootNode.cost)
+        openNodes[rootId] = (rootNode.state, rootNode.hash, rootNode.move)
+        frontier.extend([(rootId, rootNode.cost)])
+        visitedStates.add(StateKey(rootNode.state, rootNode.hash))
+
+        # define the number of single card moves and the node id of the shortest path to each game state, by zobrist
+        # hash, None if the game states are not opened again
+        pathCosts = {rootNode.hash: (rootNode.pathCost, rootId)} if reopen else None
+
+        # set the number of loops to 0
+        numbrerOfLoops = 0
+
+        # define the id of the expanded node with the greatest progress, its path is returned if the budget is exhausted
+        bestId = None
+        bestProgress = -1
+
+    # start the budget
+    budget = budget or Budget()
+    budget.start()
+    checkpointTime = time.time()
+
+    # while the frontier is not empty
+    while len(frontier) > 0:
+        exhausted = budget.isExhausted()
+
+        # write the search to the checkpoint file, the clock is read every BUDGET_CHECK_INTERVAL loops like the budget
+        if checkpoint is not None and (exhausted or (numbrerOfLoops % BUDGET_CHECK_INTERVAL == 0
+                                                     and time.time() - checkpointTime > CHECKPOINT_INTERVAL * 60)):
+            writeCheckpoint(checkpoint, {"rootState": rootNode.state, "settings": settings},
+                            {"store": store, "openNodes": openNodes, "frontier": frontier,
+                             "visitedStates": visitedStates, "pathCosts": pathCosts,
+                             "numberOfLoops": numbrerOfLoops, "bestId": bestId, "bestProgress": bestProgress})
+            checkpointTime = time.time()
+
+        # if the budget is exhausted, return the path to the best node
+        if exhausted:
+            return returnPartialPath(budget, None if bestId is None else store.getPath(bestId, rootNode.state))
 
+        # increment the number of loops
         numbrerOfLoops += 1
-        # get the last node added to the stack and remove it from the stack
-        if len(queue) > 0:
-            currentNode = queue.pop(0)
-            currentNodeDepth = currentNode.depth
-            movesMade.append(currentNode.move)
-        else:
-            return movesMade
 
-        endTime = time.time()
-        executionTime = endTime - startTime
+        # get the next node of the frontier
+        currentId = frontier.pop()
+        state, stateHash, move = openNodes.pop(currentId)
 
-        # print current execution time
-
-        # print("Current execution time: " + str(round(executionTime / 60, 1)) + " minutes. "
-        #       + "Current depth: " + str(currentNode.depth)
-        #       + ". Stack length: " + str(len(queue))
-        #       + ". Number of visited states: " + str(len(visitedStates))
-        #       + ". Number of moves made: " + str(len(movesMade)), end="\n")
-
-        # if the execution time is greater than the maximum execution time
-        if round(executionTime / 60, 1) > maxExecutionTime:
-            print("Execution time exceeded  : " + str(maxExecutionTime) + " minutes\n")
-            print("No solution found !!!\n")
-
-            # return the visited nodes
-            return movesMade
+        # add the move of the node to the exploration trace
+        if trace is not None:
+            trace.append(move)
 
         # if the current node is the goal node
-        if isGoalState(currentNode):
-            # set the flag to true
-            solutionFound = True
-            # print("Goal state found")
-            print("Goal state found at depth", currentNode.depth)
-            # find the execution time
-            endTime = time.time()
-            executionTime = endTime - startTime
-
-            # convert the execution time to seconds
-
-            # print execution time in seconds
-            print("Execution time: " + str(round(executionTime / 60, 1)) + " minutes")
-            print(str(numbrerOfLoops) + " loops were made\n")
-            # return the moves made
-            return movesMade
-
-        # if the current node is not the goal node
-        else:
-            # find the children nodes
-            childrenNodes = findNewNodes(currentNode)
+        if isGoal(state):
+            report("Goal state found at depth", store.depths[currentId])
+            report("Execution time: " + str(round(budget.executionTime(), 1)) + " minutes")
+            report(str(numbrerOfLoops) + " loops were made\n")
+            # return the moves of the path from the root node to the goal node
+            return store.getPath(currentId, rootNode.state)
+
+        # remember the node with the greatest progress
+        progress = getProgress(state)
+        if progress > bestProgress:
+            bestId = currentId
+            bestProgress = progress
+
+        # find the children of the current node that are not visited
+        depth = store.depths[currentId] + 1
+        pathCost = store.pathCosts[currentId]
+        children = []
+        for childMove, childState, childHash in findChildren(state, move):
+            childKey = StateKey(childState, childHash)
+            childPathCost = pathCost + childMove.numberOfSteps()
+            if childKey in visitedStates:
+                # if the game states are opened again and the path to the child is shorter, replace its node
+                shortestPath = None if pathCosts is None else pathCosts.get(childHash)
+                if shortestPath is None or childPathCost >= shortestPath[0]:
+                    continue
+                openNodes.pop(shortestPath[1], None)
+            else:
+                # add the child state to the visited states
+                visitedStates.add(childKey)
+
+            # add the child node to the node store
+            cost = 0 if costFunction is None else costFunction(childPathCost, childState)
+            childId = store.add(currentId, encodeMove(childMove), depth, childPathCost, cost)
+            openNodes[childId] = (childState, childHash, childMove)
+            if pathCosts is None:
+                children.append((childId, cost))
+            else:
+                # push the child with its hash as key, so its node is replaced if a shorter path is found
+                pathCosts[childHash] = (childPathCost, childId)
+                frontier.push(childId, cost, childHash)
 
-            childrenNodesToBeAddedToStack = []
-            # if children nodes are not none
-            if childrenNodes is not None:
-                # for each child node
-                for childNode in childrenNodes:
-                    # if the child node is not visited
-                    if not isVisited(visitedStates, childNode):
-                        # add the child node to children nodes to be added to the stack
-                        childrenNodesToBeAddedToStack.append(childNode)
+        # add the children to the frontier
+        frontier.extend(children)
 
-                        lastNodeDepth = childNode.depth
+    report("No solution found !!!\n")
 
-                        # add the child state to the visited states
-                        visitedStates.append(childNode.gameState)
+    # no solution was found
+    return None
 
-                childrenNodesToBeAddedToStack.reverse()
-                # for each child node to be added to the stack
-                for childNode in childrenNodesToBeAddedToStack:
-                    # add the child node to the stack
-                    queue.insert(0, childNode)
 
+# define the Breadth First Search function that is used to find the solution
+def BFS(rootNode, trace=None, budget=None, closedSet=None, checkpoint=None, resume=False):
+    return graphSearch(rootNode, QueueFrontier(), trace=trace, budget=budget, closedSet=closedSet,
+                       checkpoint=checkpoint, resume=resume, settings=checkpointSettings("BFS"))
 
-# define a function to calculate the cost of a node
-def calculateCost(node):
-    # find how many cards are in the foundations
-    cardsInFoundations = 0
-    for foundation in node.gameState.foundation:
-        cardsInFoundations += foundation.numberOfCards()
 
-    # find how many foundations are empty
-    emptyFoundations = 0
-    for foundation in node.gameState.foundation:
-        if foundation.numberOfCards() == 0:
-            emptyFoundations += 1
+# implement the Depth First Search function that is used to find the solution using the DFS algorithm.
+def DFS(rootNode, trace=None, budget=None, closedSet=None, checkpoint=None, resume=False):
+    return graphSearch(rootNode, StackFrontier(), trace=trace, budget=budget, closedSet=closedSet,
+                       checkpoint=checkpoint, resume=resume, settings=checkpointSettings("DFS"))
 
-    # find how many cards are in the freecells
-    cardsInFreecells = 0
-    for freecell in node.gameState.freecell:
-        if freecell.card is not None:
-            cardsInFreecells += 1
 
-    # find how many free cells are empty
-    emptyFreeCells = 0
-    for freecell in node.gameState.freecell:
-        # if the free cell is empty
-        if freecell.isEmpty():
-            # increment the number of empty free cells
-            emptyFreeCells += 1
+# implement the Best First Search algorithm
+# the heuristic is a function of the packed game state, see HEURISTICS
+def bestFirstSearch(rootNode, heuristic=heuristicCost, trace=None, budget=None, closedSet=None, checkpoint=None,
+                    resume=False):
+    return graphSearch(rootNode, PriorityQueue(), lambda pathCost, state: heuristic(state), trace, budget, closedSet,
+                       checkpoint, resume, checkpointSettings("BEST", heuristic))
 
-    # find how many stacks are not empty
-    nonEmptyStacks = 0
-    for stack in node.gameState.stack:
-        if not stack.isEmpty():
-            nonEmptyStacks += 1
 
-    # find how many cards are in the stacks
-    cardsInStacks = 0
-    for stack in node.gameState.stack:
-        cardsInStacks += stack.numberOfCards()
+# implement the A* algorithm
+# the cost of a node is the number of single card moves made plus the weight times the heuristic,
+# a weight greater than 1 (weighted A*) finds longer solutions faster
+# a game state reached again by a shorter path is opened again, so with an admissible heuristic and a weight of 1 the
+# solution has the fewest single card moves
+def aStar(rootNode, heuristic=heuristicCost, weight=1.0, trace=None, budget=None, closedSet=None, checkpoint=None,
+          resume=False):
+    return graphSearch(rootNode, PriorityQueue(), lambda pathCost, state: pathCost + weight * heuristic(state), trace,
+                       budget, closedSet, checkpoint, resume, checkpointSettings("ASTAR", heuristic, weight), True)
+
+
+# implement the beam search algorithm
+# the search expands the nodes depth by depth and keeps only the beamWidth nodes with the lowest score of each depth,
+# so the memory and the time of each depth are bounded. The score is a function of the packed game state.
+def beamSearch(rootNode, beamWidth=BEAM_WIDTH, scoreFunction=heuristicCost, trace=None, budget=None, closedSet=None):
+    # create the node store
+    store = NodeStore()
+
+    # create a set to store the keys of the visited states, or use the given closed set
+    visitedStates = set() if closedSet is None else closedSet
+
+    # define the nodes of the current depth, (node id, packed game state, zobrist hash, move)
+    rootId = store.add(-1, 0, rootNode.depth, rootNode.pathCost, rootNode.cost)
+    layer = [(rootId, rootNode.state, rootNode.hash, rootNode.move)]
 
-    # calculate the cost
-    cost = cardsInStacks + cardsInFreecells - cardsInFoundations - nonEmptyStacks
+    # add the root node to the visited states
+    visitedStates.add(StateKey(rootNode.state, rootNode.hash))
 
-    # return the cost
-    return cost
+    # start the budget
+    budget = budget or Budget()
+    budget.start()
 
+    # set the number of loops to 0
+    numbrerOfLoops = 0
 
-# implement the Best First Search algorithm
-def bestFirstSearch(rootNode):
-    # create a queue
-    queue = []
+    # define the id of the expanded node with the greatest progress, its path is returned if the budget is exhausted
+    bestId = None
+    bestProgress = -1
+
+    # while the current depth has nodes
+    while len(layer) > 0:
+        # define the children of the nodes of the current depth, by key of their game state
+        nextLayer = {}
+
+        for currentId, state, stateHash, move in layer:
+            # if the budget is exhausted, return the path to the best node
+            if budget.isExhausted():
+                return returnPartialPath(budget, None if bestId is None else store.getPath(bestId, rootNode.state))
+
+            # increment the number of loops
+            numbrerOfLoops += 1
+
+            # add the move of the node to the exploration trace
+            if trace is not None:
+                trace.append(move)
+
+            # if the current node is the goal node
+            if isGoal(state):
+                report("Goal state found at depth", store.depths[currentId])
+                report("Execution time: " + str(round(budget.executionTime(), 1)) + " minutes")
+                report(str(numbrerOfLoops) + " loops were made\n")
+                # return the moves of the path from the root node to the goal node
+                return store.getPath(currentId, rootNode.state)
+
+            # remember the node with the greatest progress
+            progress = getProgress(state)
+            if progress > bestProgress:
+                bestId = currentId
+                bestProgress = progress
+
+            for childMove, childState, childHash in findChildren(state, move):
+                # if the child node is not in the visited nodes or in the next depth
+                childKey = StateKey(childState, childHash)
+                if childKey not in visitedStates and childKey not in nextLayer:
+                    nextLayer[childKey] = (currentId, childMove, childState, childHash, scoreFunction(childState))
+
+        # keep the nodes of the next depth with the lowest score
+        layer = []
+        for parentId, childMove, childState, childHash, score in heapq.nsmallest(beamWidth, nextLayer.values(),
+                                                                                 key=lambda x: x[4]):
+            childId = store.add(parentId, encodeMove(childMove), store.depths[parentId] + 1,
+                                store.pathCosts[parentId] + childMove.numberOfSteps(), score)
+            layer.append((childId, childState, childHash, childMove))
+            visitedStates.add(StateKey(childState, childHash))
+
+    report("No solution found !!!\n")
+
+    # no solution was found
+    return None
+
+
+# The external memory BFS keeps the game states of each depth (layer) in a file of fixed width records, sorted by their
+# bytes. The children of a layer are written to sorted runs of EXTERNAL_BFS_BUFFER_SIZE records, the runs are merged to
+# the next layer and the duplicates are removed by merging them with the previous layers (delayed duplicate detection).
+# A record is the ranks of the foundations, the free cells and the stacks separated by 0, padded with 0 to the state
+# size, followed by the zobrist hash of the game state, the zobrist hash of its parent and the code of the move from the
+# parent (see encodeMove), so the path to a game state is found by reading the previous layers without expanding them.
+# The records are sorted by their bytes, so the records of the same game state are next to each other.
+
+# the size of the end of a record after the game state: the hash, the hash of the parent and the move code
+RECORD_LINK_SIZE = 8 + 8 + 4
+
+
+# convert a packed game state, its hash, the hash of its parent and the move code to a record with the given state size
+def encodeRecord(packedState, stateSize, stateHash, parentHash=0, moveCode=0):
+    cascades, foundations, freecells = packedState
+    record = bytes(foundations) + bytes(freecells) + b"\0".join(cascades)
+    return record + bytes(stateSize - len(record)) + stateHash.to_bytes(8, "big") + parentHash.to_bytes(8, "big") \
+        + moveCode.to_bytes(4, "big")
+
+
+# convert a record with the given state size back to a packed game state and its hash
+def decodeRecord(record, stateSize):
+    cascades = record[8:stateSize].split(b"\0")[:8]
+    return (tuple(cascades), tuple(record[0:4]), tuple(record[4:8])), int.from_bytes(record[stateSize:stateSize + 8], "big")
+
+
+# read the records of a layer file, chunkSize records at a time
+def readRecords(fileName, recordSize, chunkSize=EXTERNAL_BFS_BUFFER_SIZE):
+    with open(fileName, 'rb') as f:
+        while True:
+            data = f.read(recordSize * chunkSize)
+            if not data:
+                return
+            for i in range(0, len(data), recordSize):
+                yield data[i:i + recordSize]
+
+
+# write the records sorted and without duplicate game states to a file
+def writeSortedRecords(fileName, records, stateSize):
+    records.sort()
+    with open(fileName, 'wb') as f:
+        previousState = None
+        for record in records:
+            if record[:stateSize] != previousState:
+                f.write(record)
+                previousState = record[:stateSize]
+
+
+# merge the sorted runs to the layer file, without the duplicate game states and the game states of the previous layer
+# files, return the number of records of the layer, or None if the budget is exhausted
+# the EXTERNAL_BFS_BUFFER_SIZE records kept in memory are split between the files that are read at the same time
+def mergeLayer(runFileNames, previousFileNames, layerFileName, stateSize, budget):
+    recordSize = stateSize + RECORD_LINK_SIZE
+    chunkSize = max(1, EXTERNAL_BFS_BUFFER_SIZE // (len(runFileNames) + len(previousFileNames)))
+    records = heapq.merge(*[readRecords(fileName, recordSize, chunkSize) for fileName in runFileNames])
+    previousRecords = heapq.merge(*[readRecords(fileName, recordSize, chunkSize) for fileName in previousFileNames])
+    previousRecord = next(previousRecords, None)
+    previousState = None if previousRecord is None else previousRecord[:stateSize]
+
+    numberOfRecords = 0
+    numberOfReadRecords = 0
+    lastState = None
+    with open(layerFileName, 'wb') as f:
+        for record in records:
+            # the merge does not count loops, the time and the memory of the budget are checked every
+            # BUDGET_CHECK_INTERVAL records
+            numberOfReadRecords += 1
+            if numberOfReadRecords % BUDGET_CHECK_INTERVAL == 0 and budget.check():
+                return None
+
+            state = record[:stateSize]
+            if state == lastState:
+                continue
+            lastState = state
+            # skip the records of the previous layers that are smaller than the record
+            while previousState is not None and previousState < state:
+                previousRecord = next(previousRecords, None)
+                previousState = None if previousRecord is None else previousRecord[:stateSize]
+            if state != previousState:
+                f.write(record)
+                numberOfRecords += 1
+    return numberOfRecords
+
+
+# find the move codes of the path from the root node to the game state of a record of the last layer
+# for each layer from the last one, the layer before it is read for the record with the hash of the parent
+def findLayerPath(layerFileNames, record, stateSize):
+    recordSize = stateSize + RECORD_LINK_SIZE
+    moveCodes = []
+    for layerFileName in reversed(layerFileNames[:-1]):
+        parentHash = record[stateSize + 8:stateSize + 16]
+        moveCodes.append(int.from_bytes(record[stateSize + 16:], "big"))
+        for parentRecord in readRecords(layerFileName, recordSize):
+            if parentRecord[stateSize:stateSize + 8] == parentHash:
+                record = parentRecord
+                break
+    moveCodes.reverse()
+    return moveCodes
+
+
+# implement the external memory BFS
+# only the buffers of the layer that is read and of its children are kept in memory, the layers are in a temporary
+# directory created in the given directory (None for the temporary directory of the system)
+# the children are compared with the duplicateLayers previous layers, the game can reach a state again after more moves,
+# so a larger number removes more duplicates but reads more from disk
+def externalBFS(rootNode, budget=None, directory=None, duplicateLayers=2):
+    # the game state of a record holds 4 foundations, 4 free cells and the cards of the stacks with the separators of
+    # the 8 stacks
+    cascades, foundations, freecells = rootNode.state
+    numberOfCards = sum(len(cascade) for cascade in cascades) + sum(foundations) + sum(1 for code in freecells if code)
+    stateSize = 8 + numberOfCards + 7
+    recordSize = stateSize + RECORD_LINK_SIZE
+
+    # start the budget
+    budget = budget or Budget()
+    budget.start()
 
-    # create a list to store the visited states
-    visitedStates = []
+    # set the number of loops to 0
+    numbrerOfLoops = 0
 
-    # create a list to store the moves made
-    movesMade = []
+    # define the expanded game state with the greatest progress and its depth, its path is returned if the budget is
+    # exhausted
+    bestRecord = None
+    bestDepth = 0
+    bestProgress = -1
+
+    with tempfile.TemporaryDirectory(dir=directory) as layerDirectory:
+        # write the first layer with the root node
+        layerFileNames = [os.path.join(layerDirectory, "layer0")]
+        with open(layerFileNames[0], 'wb') as f:
+            f.write(encodeRecord(rootNode.state, stateSize, hashState(rootNode.state)))
+
+        depth = 0
+        while True:
+            # expand the game states of the layer and write their children to sorted runs
+            runFileNames = []
+            children = []
+            for record in readRecords(layerFileNames[depth], recordSize):
+                # if the budget is exhausted, return the path to the best game state
+                if budget.isExhausted():
+                    return returnPartialPath(budget, None if bestRecord is None else replayMoves(
+                        rootNode.state, findLayerPath(layerFileNames[:bestDepth + 1], bestRecord, stateSize)))
+
+                # increment the number of loops
+                numbrerOfLoops += 1
+
+                state, stateHash = decodeRecord(record, stateSize)
+
+                # if the game state is the goal, find the path to it by reading the previous layers
+                if isGoal(state):
+                    report("Goal state found at depth", depth)
+                    report("Execution time: " + str(round(budget.executionTime(), 1)) + " minutes")
+                    report(str(numbrerOfLoops) + " loops were made\n")
+                    return replayMoves(rootNode.state, findLayerPath(layerFileNames[:depth + 1], record, stateSize))
+
+                # remember the game state with the greatest progress
+                progress = getProgress(state)
+                if progress > bestProgress:
+                    bestRecord = record
+                    bestDepth = depth
+                    bestProgress = progress
+
+                for childMove, childState, childHash in findChildren(state, None):
+                    children.append(encodeRecord(childState, stateSize, childHash, stateHash, encodeMove(childMove)))
+
+                if len(children) >= EXTERNAL_BFS_BUFFER_SIZE:
+                    runFileNames.append(os.path.join(layerDirectory, "run" + str(len(runFileNames))))
+                    writeSortedRecords(runFileNames[-1], children, stateSize)
+                    children = []
+
+            if len(children) > 0:
+                runFileNames.append(os.path.join(layerDirectory, "run" + str(len(runFileNames))))
+                writeSortedRecords(runFileNames[-1], children, stateSize)
+                children = []
+
+            # merge the runs to the next layer, without the game states of the previous layers
+            layerFileNames.append(os.path.join(layerDirectory, "layer" + str(depth + 1)))
+            numberOfRecords = mergeLayer(runFileNames, layerFileNames[max(0, depth + 1 - duplicateLayers):depth + 1],
+                                         layerFileNames[depth + 1], stateSize, budget)
+            for runFileName in runFileNames:
+                os.remove(runFileName)
+
+            # if the budget was exhausted during the merge, return the path to the best game state
+            if numberOfRecords is None:
+                return returnPartialPath(budget, None if bestRecord is None else replayMoves(
+                    rootNode.state, findLayerPath(layerFileNames[:bestDepth + 1], bestRecord, stateSize)))
+
+            # if the next layer is empty, all the game states were searched
+            if numberOfRecords == 0:
+                report("No solution found !!!\n")
+                return None
+
+            depth += 1
+
+
+# define a function that checks if a game state is a win state
+def isGoalGameState(gameState):
+    highestRank = gameState.foundation[0].numberOfCards()
+    for foundation in gameState.foundation:
+        if foundation.numberOfCards() != highestRank or foundation.isEmpty():
+            return False
+    for stack in gameState.stack:
+        if not stack.isEmpty():
+            return False
+    for freecell in gameState.freecell:
+        if not freecell.isEmpty():
+            return False
+    return True
 
-    # create a list to store the nodes to be added to the queue
-    nodesToBeAddedToQueue = []
 
-    # add the root node to the queue
-    queue.append(rootNode)
+# implement the Iterative Deepening A* algorithm
+# each iteration is a depth first search that stops at the nodes whose cost (number of single card moves made plus
+# the weight times the heuristic) is greater than the bound, the next bound is the smallest cost that was greater.
+# Only the current path is kept in memory: the moves are made on a single game state and undone when backtracking.
+# The transposition table maps the zobrist hash of a game state to the iteration and the number of moves with which
+# the game state was searched, and to a lower bound of its heuristic learned by the search. The game state is not
+# searched again in the same iteration with as many moves or more. The table holds at most IDA_STAR_TABLE_SIZE states.
+# return the moves of the solution, or None if no solution was found
+def idaStar(rootNode, heuristic=heuristicMinMoves, weight=1.0, trace=None, budget=None):
+    # unpack the game state of the root node, the search makes its moves on it
+    gameState = rootNode.gameState
 
-    # add the root node to the visited states
-    visitedStates.append(rootNode.gameState)
+    # define the moves of the current path
+    path = []
 
-    # set the flag to false
-    solutionFound = False
+    # define the transposition table
+    table = {}
 
-    # set the start time
-    startTime = time.time()
+    # start the budget
+    budget = budget or Budget()
+    budget.start()
 
-    maxExecutionTime = MAX_EXECUTION_TIME
     # set the number of loops to 0
     numbrerOfLoops = 0
+    iteration = 0
 
-    # while the queue is not empty
-    while len(queue) > 0:
-        # increment the number of loops
-        numbrerOfLoops += 1
-        # get the first node in the queue i.e. the node with the lowest cost if the queue is not empty
-        if len(queue) > 0:
-            currentNode = queue.pop(0)
-            currentNodeDepth = currentNode.depth
-            movesMade.append(currentNode.move)
-        else:
-            return movesMade
-
-        endTime = time.time()
-        executionTime = endTime - startTime
-
-        # print current execution time
-
-        # print("Current execution time: " + str(round(executionTime / 60, 1)) + " minutes. "
-        #       + "Current depth: " + str(currentNode.depth)
-        #       + ". Queue length: " + str(len(queue))
-        #       + ". Number of visited states: " + str(len(visitedStates))
-        #       + ". Number of moves made: " + str(len(movesMade)), end="\n")
+    # define the moves of the path to the searched game state with the greatest progress, returned if the budget is
+    # exhausted
+    bestPath = None
+    bestProgress = -1
 
-        # if the execution time is greater than the maximum execution time
-        if round(executionTime / 60, 1) > maxExecutionTime:
-            print("Execution time exceeded  : " + str(maxExecutionTime) + " minutes\n")
-            print("No solution found !!!\n")
+    # define the depth first search of an iteration, return 0 if the goal is found, else the smallest cost above the bound
+    def search(pathCost, bound, lastMove):
+        nonlocal numbrerOfLoops, bestPath, bestProgress
 
-            # return the visited nodes
-            return movesMade
-
-        # if the current node is the goal node
-        if isGoalState(currentNode):
-            # set the flag to true
-            solutionFound = True
-            # print("Goal state found")
-            print("Goal state found at depth", currentNode.depth)
-            # find the execution time
-            endTime = time.time()
-            executionTime = endTime - startTime
-
-            # convert the execution time to seconds
-
-            # print execution time in seconds
-            print("Execution time: " + str(round(executionTime / 60, 1)) + " minutes")
-            print(str(numbrerOfLoops) + " loops were made\n")
-            # return the moves made
-            return movesMade
-
-        # if the current node is not the goal node
+        # find the heuristic of the game state, or the lower bound learned by the previous iterations
+        entry = table.get(gameState.hash)
+        if entry is not None:
+            estimate = entry[2]
         else:
-            # get the children nodes of the current node
-            childrenNodes = findNewNodes(currentNode)
-
-            # if the children nodes are not empty
-            if childrenNodes is not None:
-                # for each child node
-                for childNode in childrenNodes:
-                    # if the child node is not in the visited nodes
-                    if not isVisited(visitedStates, childNode):
-                        # calculate the cost of the child node
-                        childNode.cost = calculateCost(childNode)
-                        # add the child state to the visited states
-                        visitedStates.append(childNode.gameState)
-                        # add the child node to the queue
-                        queue.append(childNode)
-
-            # sort the queue depending on the ascending order of the cost
-            queue.sort(key=lambda x: x.cost)
-
-    # find the execution time
-    endTime = time.time()
-    executionTime = endTime - startTime
-
-    # convert the execution time to seconds
-    executionTime = executionTime * 1000
-    # print execution time in seconds
-    print("Execution time: " + str(executionTime) + " seconds\n")
-    print("No solution found !!!\n")
-
-    # return the visited nodes
-    return movesMade
+            estimate = heuristic(packState(gameState))
+        cost = pathCost + weight * estimate
+        if cost > bound:
+            return cost
 
+        if isGoalGameState(gameState):
+            return 0
 
-# implement the A* algorithm
-def aStar(startState):
-    # create a queue
-    queue = []
+        # stop the search if the budget is exhausted
+        if budget.isExhausted():
+            return math.inf
 
-    # create a list to store the visited states
-    visitedStates = []
+        numbrerOfLoops += 1
+        # add the move of the node to the exploration trace
+        if trace is not None:
+            trace.append(lastMove)
+
+        # remember the path with the greatest progress
+        progress = sum(gameState.foundationRanks())
+        if progress > bestProgress:
+            bestPath = list(path)
+            bestProgress = progress
+
+        # mark the game state as searched in this iteration with this number of moves
+        if entry is not None or len(table) < IDA_STAR_TABLE_SIZE:
+            table[gameState.hash] = (iteration, pathCost, estimate)
+
+        minimumCost = math.inf
+        validMoves = getValidMoves(gameState, lastMove)
+        if validMoves is not None:
+            for move in validMoves:
+                # make the move and the automatic moves
+                gameState.makeMove(move)
+                move.autoMoves = autoPlay(gameState)
+                nextPathCost = pathCost + move.numberOfSteps()
+
+                # skip the game states already searched in this iteration with as many moves or less
+                nextEntry = table.get(gameState.hash)
+                if nextEntry is None or nextEntry[0] != iteration or nextEntry[1] > nextPathCost:
+                    path.append(move)
+                    result = search(nextPathCost, bound, move)
+                    if result == 0:
+                        return 0
+                    path.pop()
+                    minimumCost = min(minimumCost, result)
+
+                # undo the automatic moves and the move
+                for autoMove in reversed(move.autoMoves):
+                    gameState.unmakeMove(autoMove)
+                gameState.unmakeMove(move)
+
+        # learn a better lower bound of the heuristic of the game state
+        if minimumCost != math.inf and gameState.hash in table:
+            table[gameState.hash] = (iteration, pathCost, max(estimate, (minimumCost - pathCost) / weight))
+
+        return minimumCost
+
+    # play the safe foundation moves of the root game state before the search
+    rootMoves = autoPlay(gameState)
+
+    bound = weight * heuristic(packState(gameState))
+    while True:
+        iteration += 1
+        result = search(0, bound, None)
+
+        if result == 0:
+            report("Goal state found at depth", len(path))
+            report("Execution time: " + str(round(budget.executionTime(), 1)) + " minutes")
+            report(str(numbrerOfLoops) + " loops were made\n")
+            return rootMoves + path
+
+        # if the budget is exhausted, return the path with the greatest progress
+        if budget.exhausted is not None:
+            return returnPartialPath(budget, None if bestPath is None else rootMoves + bestPath)
+
+        if result == math.inf:
+            report("No solution found !!!\n")
+            return None
 
-    # create a list to store the moves made
-    movesMade = []
+        # search again with the smallest cost that was greater than the bound
+        bound = result
+
+
+# define the function that reads a deal from an input file and returns its game state
+def readDeal(fileName):
+    infile = [line.replace("\n", "").split() for line in open(fileName, 'r', encoding='utf-8')]
+    report(infile, "\n")
+
+    return parseDeal(infile)
+
+
+# define the function that returns the game state of a deal given as the list of the card names of each stack
+def parseDeal(infile):
+    # Create the game.
+    gameState = GameState()
+
+    # Populate the game stacks.
+    for i in range(len(infile)):
+        for j in range(len(infile[i])):
+            # create a new card
+            card = getCard(infile[i][j][0], int(infile[i][j][1:]))
+            # add the card to the game stack i
+            gameState.stack[i].add(card)
+
+            # # initially populate the stacks with the cards
+            # if gameState.stack[0].numberOfCards() < 7:
+            #     gameState.stack[0].add(card)
+            # elif gameState.stack[1].numberOfCards() < 7:
+            #     gameState.stack[1].add(card)
+            # elif gameState.stack[2].numberOfCards() < 7:
+            #     gameState.stack[2].add(card)
+            # elif gameState.stack[3].numberOfCards() < 7:
+            #     gameState.stack[3].add(card)
+            # elif gameState.stack[4].numberOfCards() < 6:
+            #     gameState.stack[4].add(card)
+            # elif gameState.stack[5].numberOfCards() < 6:
+            #     gameState.stack[5].add(card)
+            # elif gameState.stack[6].numberOfCards() < 6:
+            #     gameState.stack[6].add(card)
+            # elif gameState.stack[7].numberOfCards() < 6:
+            #     gameState.stack[7].add(card)
+            # else:
+            #     print("Error: All stacks are full !! Try a different input file.\n")
+
+    return gameState
+
+
+# write the moves to the output file
+# the moves are the solution found by a search algorithm, or its exploration trace
+def writeMoves(fileName, movesMade):
+    with open(fileName, 'w', encoding='utf-8') as f:
+        # if movesMade is not empty
+        if movesMade is not None:
+            # find the lines of the moves, the root node has no move
+            lines = []
+            for move in movesMade:
+                if move is not None:
+                    lines.extend(move.getNames())
+
+            # write the number of moves made
+            f.write(str(len(lines)) + "\n")
+            # write the move names to the output file
+            for line in lines:
+                f.write(line + "\n")
 
-    # add the root node to the queue
-    queue.append(rootNode)
+        else:
+            # write No solution to the output file
+            f.write("No solution")
+
+
+# define the names of the algorithms that can be given on the command line, by the name of the algorithm they select
+ALGORITHMS = {"BFS": "BFS", "bfs": "BFS", "B": "BFS", "b": "BFS", "BREADTH": "BFS", "breadth": "BFS",
+              "DFS": "DFS", "dfs": "DFS", "D": "DFS", "d": "DFS", "DEPTH": "DFS", "depth": "DFS",
+              "BEST": "BEST", "best": "BEST",
+              "ASTAR": "ASTAR", "astar": "ASTAR",
+              "IDASTAR": "IDASTAR", "idastar": "IDASTAR",
+              "BEAM": "BEAM", "beam": "BEAM",
+              "EXTBFS": "EXTBFS", "extbfs": "EXTBFS",
+              "HDASTAR": "HDASTAR", "hdastar": "HDASTAR",
+              "PORTFOLIO": "PORTFOLIO", "portfolio": "PORTFOLIO"}
+
+# define the algorithms that record the exploration trace, see runAlgorithm
+TRACE_ALGORITHMS = ("BFS", "DFS", "BEST", "ASTAR", "IDASTAR", "BEAM")
+
+# define the algorithms that can write a checkpoint of their search and resume it, see graphSearch
+CHECKPOINT_ALGORITHMS = ("BFS", "DFS", "BEST", "ASTAR")
+
+# define the variants of the algorithms raced by the portfolio search, (algorithm, heuristic, weight)
+# the first variants are the ones that solve the most deals quickly, they are used when there are fewer workers
+PORTFOLIO_VARIANTS = [("BEST", "weighted", 1.0),
+                      ("ASTAR", "weighted", 1.0),
+                      ("BEAM", "weighted", 1.0),
+                      ("IDASTAR", "weighted", 1.0),
+                      ("DFS", None, 1.0),
+                      ("BEST", "cost", 1.0),
+                      ("ASTAR", "cost", 2.0),
+                      ("BFS", None, 1.0)]
+
+
+# define the function that runs an algorithm of the ALGORITHMS dictionary from the root node
+# heuristic is the name of a heuristic of the HEURISTICS dictionary, None for the default heuristic of the algorithm
+# return the moves of the solution, or None if no solution was found
+# budget is the Budget of the search, None for the default budget; if it is exhausted the moves of a partial path
+# are returned and budget.exhausted tells which limit was exceeded
+# workers is the number of processes of the parallel searches, None for the number of CPUs
+# directory is the directory of the layer files of the external memory BFS, None for the temporary directory of the system
+# closedSet is the set of the visited states of BFS, DFS, BEST, ASTAR and BEAM (a MmapClosedSet), None to keep them
+# in memory
+# checkpoint is the checkpoint file of BFS, DFS, BEST and ASTAR, resume is True to continue the search of the file
+def runAlgorithm(algorithm, rootNode, heuristic=None, weight=1.0, beamWidth=BEAM_WIDTH, trace=None, budget=None,
+                 workers=None, directory=None, closedSet=None, checkpoint=None, resume=False):
+    algorithm = ALGORITHMS[algorithm]
+
+    if algorithm == "PORTFOLIO":
+        # race the variants of the algorithms, the exploration trace is not kept
+        return portfolioSearch(rootNode, workers, beamWidth, budget)
+
+    elif algorithm == "HDASTAR":
+        # run the hash distributed A* algorithm, the exploration trace is not kept
+        return hdaStar(rootNode, HEURISTICS[heuristic or "cost"], weight, workers, budget)
+
+    elif algorithm == "BFS":
+        # run the BFS algorithm
+        return BFS(rootNode, trace, budget, closedSet, checkpoint, resume)
+
+    elif algorithm == "EXTBFS":
+        # run the external memory BFS algorithm, the exploration trace is not kept
+        return externalBFS(rootNode, budget, directory)
+
+    elif algorithm == "DFS":
+        # run the DFS algorithm
+        return DFS(rootNode, trace, budget, closedSet, checkpoint, resume)
+
+    elif algorithm == "BEST":
+        # run the best first search algorithm
+        return bestFirstSearch(rootNode, HEURISTICS[heuristic or "cost"], trace, budget, closedSet, checkpoint, resume)
+
+    elif algorithm == "ASTAR":
+        # run the A* algorithm
+        return aStar(rootNode, HEURISTICS[heuristic or "cost"], weight, trace, budget, closedSet, checkpoint, resume)
+
+    elif algorithm == "IDASTAR":
+        # run the IDA* algorithm
+        return idaStar(rootNode, HEURISTICS[heuristic or "minmoves"], weight, trace, budget)
 
-    # add the root node to the visited states
-    visitedStates.append(rootNode.gameState)
+    else:
+        # run the beam search algorithm, the nodes are scored with the heuristic
+        return beamSearch(rootNode, beamWidth, HEURISTICS[heuristic or "cost"], trace, budget, closedSet)
+
+
+# define the function that runs a variant of the portfolio search in a worker process
+# the moves found (None if no solution was found) are put in the results queue with the index of the variant and the
+# limit of the budget that was exceeded (None if the moves are a solution)
+def runPortfolioVariant(index, rootState, beamWidth, budget, results):
+    # the messages of the search algorithm are not printed
+    messages.verbose = False
+
+    algorithm, heuristic, weight = PORTFOLIO_VARIANTS[index]
+    movesMade = runAlgorithm(algorithm, Node(None, None, rootState), heuristic, weight, beamWidth, budget=budget)
+    results.put((index, movesMade, budget.exhausted, budget.numberOfLoops))
+
+
+# implement the portfolio search
+# the first variants of PORTFOLIO_VARIANTS are run from the root node in parallel worker processes, one per variant,
+# the moves of the first variant that finds a solution are returned and the other processes are stopped
+# each variant has the budget, if no variant finds a solution the partial path with the most foundation moves is returned
+def portfolioSearch(rootNode, workers=None, beamWidth=BEAM_WIDTH, budget=None):
+    numberOfVariants = min(workers or os.cpu_count() or 1, len(PORTFOLIO_VARIANTS))
+    budget = budget or Budget()
+    budget.start()
+
+    # start a process for each variant
+    results = multiprocessing.Queue()
+    processes = []
+    for index in range(numberOfVariants):
+        process = multiprocessing.Process(target=runPortfolioVariant,
+                                          args=(index, rootNode.state, beamWidth, budget, results))
+        process.start()
+        processes.append(process)
+
+    # wait for the first solution or for all the variants to finish
+    movesMade = None
+    partialPath = None
+    remaining = numberOfVariants
+    while remaining > 0:
+        try:
+            index, variantMoves, exhausted, budget.numberOfLoops = results.get(timeout=1)
+        except queue.Empty:
+            # stop waiting if a process ended without a result
+            if not any(process.is_alive() for process in processes) and results.empty():
+                break
+            continue
+        remaining -= 1
+        if variantMoves is not None and exhausted is None:
+            movesMade = variantMoves
+            algorithm, heuristic, weight = PORTFOLIO_VARIANTS[index]
+            report("Solution found by " + algorithm + " (heuristic: " + str(heuristic) + ", weight: " + str(weight) + ")")
+            break
+        # keep the partial path with the most foundation moves
+        if exhausted is not None:
+            budget.exhausted = exhausted
+            if variantMoves is not None and (partialPath is None or countFoundationMoves(variantMoves)
+                                             > countFoundationMoves(partialPath)):
+                partialPath = variantMoves
+
+    # stop the other variants
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+    if movesMade is not None:
+        budget.exhausted = None
+        return movesMade
+    if budget.exhausted is not None:
+        return returnPartialPath(budget, partialPath)
+    report("No solution found !!!\n")
+    return None
+
+
+# The hash distributed A* algorithm (HDA*) runs an A* search in each worker process. Each game state is owned by the
+# worker of index zobrist hash modulo the number of workers, which keeps it in its open list and its visited states.
+# A worker expands its best node and sends the children it does not own to their owners through their inbox queues,
+# so each game state is searched by a single worker. The nodes carry the codes of the moves from the root node.
+# The search ends when a worker finds the goal, or when all the workers are idle and every batch of nodes that was
+# sent was received (the counters are checked twice to see that no batch is in transit).
+# The workers put messages in the results queue: ("goal", path) when a worker finds the goal, ("exhausted", limit) when
+# its memory budget is exhausted, and ("partial", progress, path) with its best path when it is stopped.
+
+# define the function that runs a worker of the hash distributed A* algorithm
+# the nodes are (packed game state, zobrist hash, number of single card moves, move codes of the path)
+def runHdaStarWorker(index, inboxes, results, stop, idle, sent, received, expanded, heuristic, weight, maxMemory):
+    # the worker checks its own memory, the main process checks the execution time and the number of loops
+    budget = Budget(None, None, maxMemory)
+
+    # define the path of the expanded node with the greatest progress
+    bestPath = ()
+    bestProgress = -1
+
+    numberOfWorkers = len(inboxes)
+    inbox = inboxes[index]
+
+    # define the open list and the number of moves of the best path found to each owned game state
+    frontier = PriorityQueue()
+    bestPathCosts = {}
+
+    # add a node owned by the worker to its open list, if its game state was not reached with fewer moves
+    def addNode(node):
+        state, stateHash, pathCost, path = node
+        key = StateKey(state, stateHash)
+        if bestPathCosts.get(key, math.inf) <= pathCost:
+            return
+        bestPathCosts[key] = pathCost
+        frontier.push(node, pathCost + weight * heuristic(state), key)
+
+    # add the nodes of a batch received from the inbox
+    def receive(batch):
+        idle[index] = 0
+        with received.get_lock():
+            received.value += 1
+        for node in batch:
+            addNode(node)
+
+    numberOfLoops = 0
+    while not stop.is_set():
+        # receive the nodes sent by the other workers
+        try:
+            while True:
+                receive(inbox.get_nowait())
+        except queue.Empty:
+            pass
+
+        # wait for nodes if the open list is empty
+        if len(frontier) == 0:
+            idle[index] = 1
+            try:
+                receive(inbox.get(timeout=0.01))
+            except queue.Empty:
+                pass
+            continue
 
-    # set the flag to false
-    solutionFound = False
+        if budget.isExhausted():
+            results.put(("exhausted", budget.exhausted))
+            stop.set()
+            break
+
+        state, stateHash, pathCost, path = frontier.pop()
+        numberOfLoops += 1
+        if numberOfLoops % 100 == 0:
+            expanded[index] = numberOfLoops
+
+        # if the node is the goal node, send its path to the main process
+        if isGoal(state):
+            expanded[index] = numberOfLoops
+            results.put(("goal", path))
+            stop.set()
+            return
+
+        # remember the node with the greatest progress
+        progress = getProgress(state)
+        if progress > bestProgress:
+            bestPath = path
+            bestProgress = progress
+
+        # find the children and send the ones of the other workers in one batch per worker
+        batches = [[] for i in range(numberOfWorkers)]
+        for childMove, childState, childHash in findChildren(state, None):
+            child = (childState, childHash, pathCost + childMove.numberOfSteps(), path + (encodeMove(childMove),))
+            batches[childHash % numberOfWorkers].append(child)
+        for owner in range(numberOfWorkers):
+            if len(batches[owner]) == 0:
+                continue
+            if owner == index:
+                for child in batches[owner]:
+                    addNode(child)
+            else:
+                with sent.get_lock():
+                    sent.value += 1
+                inboxes[owner].put(batches[owner])
+    expanded[index] = numberOfLoops
+    results.put(("partial", bestProgress, bestPath))
+
+
+# implement the hash distributed A* algorithm with the given number of worker processes (None for the number of CPUs)
+# the cost of a node is the number of single card moves made plus the weight times the heuristic
+# the first solution found by a worker is returned, it is not always the one with the fewest moves
+# the loops of the budget are the loops of all the workers, its memory is the memory of each worker
+def hdaStar(rootNode, heuristic=heuristicCost, weight=1.0, workers=None, budget=None):
+    numberOfWorkers = workers or os.cpu_count() or 1
+    budget = budget or Budget()
+
+    # define the shared objects of the workers
+    inboxes = [multiprocessing.Queue() for i in range(numberOfWorkers)]
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    idle = multiprocessing.Array('b', numberOfWorkers)
+    expanded = multiprocessing.Array('q', numberOfWorkers)
+    sent = multiprocessing.Value('q', 1)
+    received = multiprocessing.Value('q', 0)
+
+    # send the root node to its owner
+    inboxes[rootNode.hash % numberOfWorkers].put([(rootNode.state, rootNode.hash, 0, ())])
+
+    # start the workers
+    processes = []
+    for index in range(numberOfWorkers):
+        process = multiprocessing.Process(target=runHdaStarWorker,
+                                          args=(index, inboxes, results, stop, idle, sent, received, expanded,
+                                                heuristic, weight, budget.maxMemory))
+        process.start()
+        processes.append(process)
+
+    # start the budget
+    budget.start()
+
+    # wait for the solution, for the end of the search or for the budget to be exhausted
+    path = None
+    partialMessages = []
+    finished = False
+    while path is None:
+        try:
+            message = results.get(timeout=0.1)
+            if message[0] == "goal":
+                path = message[1]
+                break
+            elif message[0] == "exhausted":
+                budget.exhausted = message[1]
+                break
+            partialMessages.append(message)
+        except queue.Empty:
+            pass
+
+        budget.numberOfLoops = sum(expanded)
+        if budget.check():
+            break
+
+        # the search is finished if all the workers are idle and all the batches were received, twice in a row
+        terminated = all(idle) and sent.value == received.value
+        if terminated and finished:
+            break
+        finished = terminated
+
+    # stop the workers
+    stop.set()
+
+    # if the budget is exhausted, find the best path sent by the workers when they stopped
+    if budget.exhausted is not None:
+        while sum(1 for message in partialMessages if message[0] == "partial") < numberOfWorkers:
+            try:
+                partialMessages.append(results.get(timeout=1))
+            except queue.Empty:
+                break
+
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    budget.numberOfLoops = sum(expanded)
+
+    if budget.exhausted is not None:
+        partialPaths = [message for message in partialMessages if message[0] == "partial"]
+        if len(partialPaths) == 0:
+            return returnPartialPath(budget, None)
+        progress, partialPath = max((message[1], message[2]) for message in partialPaths)
+        return returnPartialPath(budget, replayMoves(rootNode.state, partialPath))
+
+    if path is None:
+        report("No solution found !!!\n")
+        return None
 
-    # set the start time
-    startTime = time.time()
+    report("Goal state found at depth", len(path))
+    report("Execution time: " + str(round(budget.executionTime(), 1)) + " minutes")
+    report(str(sum(expanded)) + " loops were made by " + str(numberOfWorkers) + " workers\n")
+    # return the moves of the path from the root node to the goal node
+    return replayMoves(rootNode.state, path)
 
-    maxExecutionTime = MAX_EXECUTION_TIME
 
-    # set the number of loops to 0
-    numbrerOfLoops = 0
+# The batch mode solves the deals of a directory or of a glob in worker processes. Each worker is set up once by
+# initBatchWorker with the algorithm and its options, then solves deals with solveDealFile.
 
-    # while the queue is not empty
-    while len(queue) > 0:
-        # increment the number of loops
-        numbrerOfLoops += 1
-        # get the first node in the queue i.e. the node with the lowest cost if the queue is not empty
-        if len(queue) > 0:
-            currentNode = queue.pop(0)
-            currentNodeDepth = currentNode.depth
-            movesMade.append(currentNode.move)
-        else:
-            return movesMade
+# define the settings of the batch worker of this process, set by initBatchWorker
+batchSettings = {}
 
-        endTime = time.time()
-        executionTime = endTime - startTime
 
-        # print current execution time
+# define the function that sets up a batch worker process
+# the messages of the search algorithms are not printed, the results are written to the summary file
+def initBatchWorker(algorithm, heuristic, weight, beamWidth, maxExecutionTime, maxLoops, maxMemory):
+    messages.verbose = False
+    batchSettings.update(algorithm=algorithm, heuristic=heuristic, weight=weight, beamWidth=beamWidth,
+                         maxExecutionTime=maxExecutionTime, maxLoops=maxLoops, maxMemory=maxMemory)
 
-        # print("Current execution time: " + str(round(executionTime / 60, 1)) + " minutes. "
-        #       + "Current depth: " + str(currentNode.depth)
-        #       + ". Queue length: " + str(len(queue))
-        #       + ". Number of visited states: " + str(len(visitedStates))
-        #       + ". Number of moves made: " + str(len(movesMade)), end="\n")
 
-        # if the execution time is greater than the maximum execution time
-        if round(executionTime / 60, 1) > maxExecutionTime:
-            print("Execution time exceeded  : " + str(maxExecutionTime) + " minutes\n")
-            print("No solution found !!!\n")
+# define the function that solves a deal in a batch worker and writes the moves to the output file
+# return the row of the summary file of the deal: input file, output file, result, number of moves, seconds
+# the result is solved, partial (the budget was exhausted and the output file holds a partial path) or no solution
+def solveDealFile(inputFileName, outputFileName):
+    startTime = time.time()
+    budget = Budget(batchSettings["maxExecutionTime"], batchSettings["maxLoops"], batchSettings["maxMemory"])
+    try:
+        rootNode = Node(None, None, readDeal(inputFileName))
+        rootNode.depth = 0
+        rootNode.cost = 0
+        movesMade = runAlgorithm(batchSettings["algorithm"], rootNode, batchSettings["heuristic"],
+                                 batchSettings["weight"], batchSettings["beamWidth"], budget=budget)
+        writeMoves(outputFileName, movesMade)
+    except Exception as error:
+        return [inputFileName, outputFileName, "error: " + str(error), "", round(time.time() - startTime, 3)]
+
+    if movesMade is None:
+        return [inputFileName, outputFileName, "no solution", "", round(time.time() - startTime, 3)]
+    numberOfMoves = sum(move.numberOfSteps() for move in movesMade)
+    result = "solved" if budget.exhausted is None else "partial"
+    return [inputFileName, outputFileName, result, numberOfMoves, round(time.time() - startTime, 3)]
+
+
+# define the function that solves the deals of a directory (its .txt files) or of a glob with a pool of worker processes
+# the output file of a deal is written to the output directory with the name of the deal followed by _solution,
+# and a row is written for each deal to the summary.csv file of the output directory
+# each deal has a budget of maxExecutionTime minutes, maxLoops loops and maxMemory megabytes (None for no limit)
+def solveBatch(algorithm, inputPattern, outputDirectory, workers=None, maxExecutionTime=MAX_EXECUTION_TIME,
+               heuristic=None, weight=1.0, beamWidth=BEAM_WIDTH, maxLoops=None, maxMemory=None):
+    # find the deal files
+    if os.path.isdir(inputPattern):
+        inputFileNames = sorted(glob.glob(os.path.join(inputPattern, "*.txt")))
+    else:
+        inputFileNames = sorted(glob.glob(inputPattern))
+    if len(inputFileNames) == 0:
+        print("No deal files found: " + inputPattern)
+        return
+
+    os.makedirs(outputDirectory, exist_ok=True)
+    summaryFileName = os.path.join(outputDirectory, "summary.csv")
+
+    print("Solving " + str(len(inputFileNames)) + " deals with " + ALGORITHMS[algorithm])
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initBatchWorker,
+                                                initargs=(algorithm, heuristic, weight, beamWidth, maxExecutionTime,
+                                                          maxLoops, maxMemory)) as executor:
+        futures = []
+        for inputFileName in inputFileNames:
+            name = os.path.splitext(os.path.basename(inputFileName))[0]
+            outputFileName = os.path.join(outputDirectory, name + "_solution.txt")
+            futures.append(executor.submit(solveDealFile, inputFileName, outputFileName))
+
+        for future in concurrent.futures.as_completed(futures):
+            row = future.result()
+            print(row[0] + ": " + row[2])
+            rows.append(row)
+
+    # write the summary file in the order of the deals
+    rows.sort(key=lambda row: row[0])
+    with open(summaryFileName, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["deal", "output", "result", "moves", "seconds"])
+        writer.writerows(rows)
+
+    solved = sum(1 for row in rows if row[2] == "solved")
+    print(str(solved) + " of " + str(len(rows)) + " deals solved, summary written to " + summaryFileName)
+
+
+# The solver can be used as a library: a Solver object holds an algorithm, its options and the limits of its budget,
+# and can solve any number of deals, from several threads at the same time. The solve function solves a single deal.
+#
+#     result = solve("S1 H2\nH1 S2\n...", "ASTAR", heuristic="weighted", maxExecutionTime=1.0)
+#     if result.solved:
+#         print(result.numberOfMoves, result.lines)
+
+# defining the class for the result of a solver
+class Result:
+    __slots__ = ("moves", "exhausted", "numberOfLoops", "executionTime")
+
+    def __init__(self, moves, exhausted, numberOfLoops, executionTime):
+        # the moves of the solution or of the partial path, None if no path was found
+        self.moves = moves
+        # the limit of the budget that was exceeded, None if the budget was not exhausted
+        self.exhausted = exhausted
+        # the number of loops (expanded nodes) of the search
+        self.numberOfLoops = numberOfLoops
+        # the execution time of the search in minutes
+        self.executionTime = executionTime
+
+    # True if the moves are a solution of the deal
+    @property
+    def solved(self):
+        return self.moves is not None and self.exhausted is None
+
+    # the lines of the output file of the moves, one for each single card move
+    @property
+    def lines(self):
+        if self.moves is None:
+            return []
+        return [line for move in self.moves for line in move.getNames()]
+
+    # the number of single card moves
+    @property
+    def numberOfMoves(self):
+        if self.moves is None:
+            return 0
+        return sum(move.numberOfSteps() for move in self.moves)
+
+    # write the moves to an output file
+    def write(self, fileName):
+        writeMoves(fileName, self.moves)
+
+
+# defining the class for a solver
+# the algorithm is a name of the ALGORITHMS dictionary and the heuristic a name of the HEURISTICS dictionary (None for
+# the default heuristic of the algorithm), the limits are the parameters of Budget (maxExecutionTime in minutes,
+# maxLoops, maxMemory in megabytes), and verbose is True to print the messages of the search algorithms
+class Solver:
+    def __init__(self, algorithm="ASTAR", heuristic=None, weight=1.0, beamWidth=BEAM_WIDTH, workers=None,
+                 verbose=False, **limits):
+        if algorithm not in ALGORITHMS:
+            raise ValueError("unknown algorithm: " + str(algorithm))
+        if heuristic is not None and heuristic not in HEURISTICS:
+            raise ValueError("unknown heuristic: " + str(heuristic))
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.weight = weight
+        self.beamWidth = beamWidth
+        self.workers = workers
+        self.verbose = verbose
+        self.limits = limits
+        # check the limits
+        Budget(**limits)
+
+    # solve a deal, given as a game state, as the text of an input file or as the list of the card names of each stack
+    def solve(self, deal):
+        if isinstance(deal, str):
+            deal = [line.split() for line in deal.splitlines()]
+        gameState = deal if isinstance(deal, GameState) else parseDeal(deal)
+
+        # each call has its own root node and budget, so the solver can be used by several threads
+        rootNode = Node(None, None, gameState)
+        budget = Budget(**self.limits)
 
-            # return the visited nodes
-            return movesMade
+        verbose = getattr(messages, "verbose", True)
+        messages.verbose = self.verbose
+        try:
+            movesMade = runAlgorithm(self.algorithm, rootNode, self.heuristic, self.weight, self.beamWidth,
+                                     budget=budget, workers=self.workers)
+        finally:
+            messages.verbose = verbose
 
-        # if the current node is the goal node
-        if isGoalState(currentNode):
-            # set the flag to true
-            solutionFound = True
-            # print("Goal state found")
-            print("Goal state found at depth", currentNode.depth)
-            # find the execution time
-            endTime = time.time()
-            executionTime = endTime - startTime
-
-            # convert the execution time to seconds
-
-            # print execution time in seconds
-            print("Execution time: " + str(round(executionTime / 60, 1)) + " minutes")
-            print(str(numbrerOfLoops) + " loops were made\n")
-            # return the moves made
-            return movesMade
-
-        # if the current node is not the goal node
-        else:
-            # get the children nodes of the current node
-            childrenNodes = findNewNodes(currentNode)
-
-            # if the children nodes are not empty
-            if childrenNodes is not None:
-                # for each child node
-                for childNode in childrenNodes:
-                    # if the child node is not in the visited nodes
-                    if not isVisited(visitedStates, childNode):
-                        # calculate the cost of the child node
-                        childNode.cost = calculateCost(childNode) + childNode.depth
-                        # add the child state to the visited states
-                        visitedStates.append(childNode.gameState)
-                        # add the child node to the queue
-                        queue.append(childNode)
-
-            # sort the queue depending on the ascending order of the cost
-            queue.sort(key=lambda x: x.cost)
-
-    # find the execution time
-    endTime = time.time()
-    executionTime = endTime - startTime
-
-    # convert the execution time to seconds
-    executionTime = executionTime * 1000
-    # print execution time in seconds
-    print("Execution time: " + str(executionTime) + " seconds\n")
-    print("No solution found !!!\n")
-
-    # return the visited nodes
-    return movesMade
+        return Result(movesMade, budget.exhausted, budget.numberOfLoops, budget.executionTime())
 
 
-if __name__ == '__main__':
+# define the function that solves a deal with a new Solver, see Solver for the options
+def solve(deal, algorithm="ASTAR", **options):
+    return Solver(algorithm, **options).solve(deal)
 
-    if len(sys.argv) != 4:
-        print("Usage: python Solver.py <Algorithm> <inputFileName> <outputFilename>")
-        sys.exit(-1)
-    else:
-        infile = [line.replace("\n", "").split() for line in open(sys.argv[2], 'r', encoding='utf-8')]
-        print(infile, "\n")
-
-        # Create the game.
-        gameState = GameState()
-
-        # Populate the game stacks.
-        for i in range(len(infile)):
-            for j in range(len(infile[i])):
-                # create a new card
-                card = Card(infile[i][j][0], int(infile[i][j][1:]))
-                # add the card to the game stack i
-                gameState.stack[i].add(card)
-
-                # if the card rank is greater than the highest rank global variable
-                if card.rank > highest_rank:
-                    # set the highest rank global variable to the card rank
-                    highest_rank = card.rank
-
-                # # initially populate the stacks with the cards
-                # if gameState.stack[0].numberOfCards() < 7:
-                #     gameState.stack[0].add(card)
-                # elif gameState.stack[1].numberOfCards() < 7:
-                #     gameState.stack[1].add(card)
-                # elif gameState.stack[2].numberOfCards() < 7:
-                #     gameState.stack[2].add(card)
-                # elif gameState.stack[3].numberOfCards() < 7:
-                #     gameState.stack[3].add(card)
-                # elif gameState.stack[4].numberOfCards() < 6:
-                #     gameState.stack[4].add(card)
-                # elif gameState.stack[5].numberOfCards() < 6:
-                #     gameState.stack[5].add(card)
-                # elif gameState.stack[6].numberOfCards() < 6:
-                #     gameState.stack[6].add(card)
-                # elif gameState.stack[7].numberOfCards() < 6:
-                #     gameState.stack[7].add(card)
-                # else:
-                #     print("Error: All stacks are full !! Try a different input file.\n")
-
-        # create the root node of the search tree
-        rootNode = Node(None, None, gameState)
-        rootNode.depth = 0
-        rootNode.cost = 0
 
-        # run the algorithm
-        if sys.argv[1] == "BFS" or sys.argv[1] == "bfs" or sys.argv[1] == "B" or sys.argv[1] == "b" or sys.argv[
-            1] == "BREADTH" or sys.argv[1] == "breadth":
-            movesMade = BFS(rootNode)
-
-            # write the moves to the output file
-            with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                # write the number of moves made
-                f.write(str(len(movesMade)) + "\n")
-                # if movesMade is not empty
-                if movesMade is not None:
-                    # for each move in movesMade
-                    for move in movesMade:
-                        # if move name is not none
-                        if move is not None:
-                            # write the move name to the output file
-                            f.write(move.name + "\n")
-
-                else:
-                    # write No solution to the output file
-                    f.write("No solution")
-
-        elif sys.argv[1] == "DFS" or sys.argv[1] == "dfs" or sys.argv[1] == "D" or sys.argv[1] == "d" or sys.argv[
-            1] == "DEPTH" or sys.argv[1] == "depth":
-            visitedStates = []
-
-            # run the DFS algorithm
-            movesMade = DFS(rootNode)
-
-            # write the moves to the output file
-            with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                # write the number of moves made
-                f.write(str(len(movesMade)) + "\n")
-                # if movesMade is not empty
-                if movesMade is not None:
-                    # for each move in movesMade
-                    for move in movesMade:
-                        # if move name is not none
-                        if move is not None:
-                            # write the move name to the output file
-                            f.write(move.name + "\n")
-
-                else:
-                    # write No solution to the output file
-                    with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                        f.write("No solution")
-
-        elif sys.argv[1] == "BEST" or sys.argv[1] == "best":
-            visitedStates = []
-
-            # run the best first search algorithm
-            movesMade = bestFirstSearch(rootNode)
-
-            # write the moves to the output file
-            with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                # write the number of moves made
-                f.write(str(len(movesMade)) + "\n")
-                # if movesMade is not empty
-                if movesMade is not None:
-                    # for each move in movesMade
-                    for move in movesMade:
-                        # if move name is not none
-                        if move is not None:
-                            # write the move name to the output file
-                            f.write(move.name + "\n")
-
-                else:
-                    # write No solution to the output file
-                    with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                        f.write("No solution")
-
-        elif sys.argv[1] == "ASTAR" or sys.argv[1] == "astar":
-            visitedStates = []
-
-            # run the A* algorithm
-            movesMade = aStar(rootNode)
-
-            # write the moves to the output file
-            with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                # write the number of moves made
-                f.write(str(len(movesMade)) + "\n")
-                # if movesMade is not empty
-                if movesMade is not None:
-                    # for each move in movesMade
-                    for move in movesMade:
-                        # if move name is not none
-                        if move is not None:
-                            # write the move name to the output file
-                            f.write(move.name + "\n")
-
-                else:
-                    # write No solution to the output file
-                    with open(sys.argv[3], 'w', encoding='utf-8') as f:
-                        f.write("No solution")
+if __name__ == '__main__':
 
-        else:
-            print("Invalid command")
+    parser = argparse.ArgumentParser(usage="python Solver.py <Algorithm> <inputFileName> <outputFilename> [options]")
+    parser.add_argument("algorithm", help="BFS, EXTBFS, DFS, BEST, ASTAR, IDASTAR, BEAM, HDASTAR or PORTFOLIO")
+    parser.add_argument("inputFileName", help="the deal, or with --batch a directory or a glob of deals")
+    parser.add_argument("outputFileName", help="the output file, or with --batch the output directory")
+    parser.add_argument("--heuristic", choices=list(HEURISTICS),
+                        help="heuristic used by BEST, ASTAR, HDASTAR, BEAM (default: cost) and IDASTAR (default: minmoves)")
+    parser.add_argument("--weight", type=float, default=1.0,
+                        help="weight of the heuristic in ASTAR, HDASTAR and IDASTAR, greater than 1 for weighted A* "
+                             "(default: 1)")
+    parser.add_argument("--trace", action="store_true",
+                        help="write the moves of all the expanded nodes (the exploration trace) instead of the solution")
+    parser.add_argument("--beam-width", type=int, default=BEAM_WIDTH,
+                        help="number of nodes kept in each depth by BEAM (default: " + str(BEAM_WIDTH) + ")")
+    parser.add_argument("--batch", action="store_true",
+                        help="solve the deals of a directory or a glob in worker processes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes of the batch mode, HDASTAR and PORTFOLIO (default: number of CPUs)")
+    parser.add_argument("--timeout", type=float, default=MAX_EXECUTION_TIME,
+                        help="maximum execution time of each deal in minutes (default: " + str(MAX_EXECUTION_TIME) + ")")
+    parser.add_argument("--max-loops", type=int, default=None,
+                        help="maximum number of loops (expanded nodes) of each deal (default: no limit)")
+    parser.add_argument("--max-memory", type=float, default=None,
+                        help="maximum peak memory of each search process in megabytes (default: no limit)")
+    parser.add_argument("--temp-dir", default=None,
+                        help="directory of the layer files of EXTBFS (default: the temporary directory of the system)")
+    parser.add_argument("--closed-set", default=None,
+                        help="file of the visited states of BFS, DFS, BEST, ASTAR and BEAM, mapped in memory "
+                             "(default: the visited states are kept in memory)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="file to which BFS, DFS, BEST and ASTAR write their search every "
+                             + str(CHECKPOINT_INTERVAL) + " minutes and when the budget is exhausted")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the search of the checkpoint file")
+    args = parser.parse_args()
+    algorithm = args.algorithm
+
+    # check the algorithm
+    if algorithm not in ALGORITHMS:
+        print("Invalid command")
+        sys.exit(1)
+
+    # check the exploration trace option
+    if args.trace and (args.batch or ALGORITHMS[algorithm] not in TRACE_ALGORITHMS):
+        print("--trace can only be used by " + ", ".join(TRACE_ALGORITHMS) + " without --batch")
+        sys.exit(1)
+
+    # check the checkpoint options
+    usesCheckpoint = args.checkpoint is not None or args.resume
+    if usesCheckpoint and (args.batch or ALGORITHMS[algorithm] not in CHECKPOINT_ALGORITHMS):
+        print("--checkpoint and --resume can only be used by " + ", ".join(CHECKPOINT_ALGORITHMS) + " without --batch")
+        sys.exit(1)
+    if args.resume and (args.checkpoint is None or not os.path.exists(args.checkpoint)):
+        print("--resume needs an existing --checkpoint file")
+        sys.exit(1)
+    if args.resume and readCheckpointHeader(args.checkpoint)["closedSet"] and args.closed_set is None:
+        print("--resume needs the --closed-set file of the search of the --checkpoint file")
+        sys.exit(1)
+
+    # if the batch mode is selected, solve the deals of the input directory or glob
+    if args.batch:
+        solveBatch(algorithm, args.inputFileName, args.outputFileName, args.workers, args.timeout, args.heuristic,
+                   args.weight, args.beam_width, args.max_loops, args.max_memory)
+        sys.exit(0)
+
+    # read the deal
+    gameState = readDeal(args.inputFileName)
+
+    # create the root node of the search tree
+    rootNode = Node(None, None, gameState)
+    rootNode.depth = 0
+    rootNode.cost = 0
+
+    # the exploration trace of the search, written instead of the solution with --trace
+    trace = [] if args.trace else None
+
+    # create the closed set file
+    closedSet = MmapClosedSet(args.closed_set, clear=not args.resume) if args.closed_set else None
+
+    # the budget of the search, if it is exhausted the moves of a partial path are written
+    budget = Budget(args.timeout, args.max_loops, args.max_memory)
+
+    # run the algorithm
+    # a checkpoint of another deal or of a search with other settings can not be resumed
+    try:
+        movesMade = runAlgorithm(algorithm, rootNode, args.heuristic, args.weight, args.beam_width, trace, budget,
+                                 args.workers, args.temp_dir, closedSet, args.checkpoint, args.resume)
+    except ValueError as error:
+        if not args.resume:
+            raise
+        print("--resume: " + str(error))
+        sys.exit(1)
+
+    if closedSet is not None:
+        closedSet.close()
+
+    # write the moves to the output file
+    writeMoves(args.outputFileName, trace if args.trace else movesMade)